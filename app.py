@@ -2,6 +2,7 @@
 from __future__ import annotations
 import asyncio
 import logging
+import multiprocessing
 import sys
 from pathlib import Path
 
@@ -40,12 +41,29 @@ def _find_stylesheet() -> Path | None:
     return None
 
 
+# 已讀取的 QSS：路徑 -> (mtime_ns, 內容)；檔案未變更時不再讀檔
+_QSS_CACHE: dict[Path, tuple[int, str]] = {}
+
+
+def _read_qss(qss_path: Path) -> str:
+    mtime_ns = qss_path.stat().st_mtime_ns
+    cached = _QSS_CACHE.get(qss_path)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+    css = qss_path.read_text(encoding="utf-8")
+    _QSS_CACHE[qss_path] = (mtime_ns, css)
+    return css
+
+
 def _apply_qss(app: QApplication, qss_path: Path) -> None:
     try:
-        css = qss_path.read_text(encoding="utf-8")
+        css = _read_qss(qss_path)
     except Exception as e:
         log.warning("讀取 QSS 失敗（%s）：%s", qss_path, e)
         return
+    # 編輯器存檔常連續觸發多次 fileChanged；內容相同就不重設（setStyleSheet 會重新 polish 所有元件）
+    if css == app.styleSheet():
+        return
     app.setStyleSheet(css)
     log.info("已套用樣式：%s", qss_path)
 
@@ -114,6 +132,11 @@ async def main():
     w = MainWindow()
     w.show()
 
+    # 連拍用的編碼子行程在啟動時就建立（freeze_support 已於 __main__ 呼叫），
+    # 第一張連拍不必等 spawn 與子行程 import
+    from core.imaging import warm_encode_pool
+    warm_encode_pool()
+
     # 建一個 Future：當最後一個視窗關閉時，把它標記完成，讓 main() 結束
     loop = asyncio.get_running_loop()
     quit_future: asyncio.Future[None] = loop.create_future()
@@ -142,5 +165,7 @@ async def main():
 
 
 if __name__ == "__main__":
+    # 打包成 exe 時，影像編碼子行程（ProcessPoolExecutor）需要此呼叫才不會重開 GUI
+    multiprocessing.freeze_support()
     # 交給 qasync.run 建立/管理事件圈；main() 裡不要再新建 QEventLoop
     qasync.run(main())
@@ -169,7 +169,7 @@ class AIClientBase(ABC):
         self.provider_name = provider_name
         self.client = None
         self.api_key: Optional[str] = None
-        self.load_settings()
+        self._read_settings()
         settings_manager.settings_changed.connect(self.load_settings)
 
     # ---------- settings / init ----------
@@ -206,6 +206,11 @@ class AIClientBase(ABC):
         pass
 
     def load_settings(self):
+        # 本 client 用到的設定都沒有變更：不必重讀設定與 keyring
+        if settings_manager.touched("AI/", f"{self.provider_name}/"):
+            self._read_settings()
+
+    def _read_settings(self):
         self.strategy = settings_manager.get("AI/Strategy")
         self.timeout = settings_manager.get_int("AI/Timeout", settings_manager.get_int("AI/TimeoutSec", 60))
         self.max_images = settings_manager.get_int("AI/MaxImages", 5)
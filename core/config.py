@@ -2,7 +2,8 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
 
 import keyring
 from PySide6.QtCore import QSettings, QStandardPaths, QObject, Signal
@@ -17,6 +18,41 @@ def _to_bool(v: Any) -> bool:
     return s in ("1", "true", "yes", "y", "on")
 
 
+def _to_int(v: Any, default: Optional[int] = None) -> int:
+    try:
+        return int(v)
+    except Exception:
+        return int(default or 0)
+
+
+def _to_str(v: Any, default: str = "") -> str:
+    # 未設定或為空字串時回傳 default
+    if v is None or v == "":
+        return default
+    return v if type(v) is str else str(v)
+
+
+class SettingsSnapshot(dict):
+    """一次讀出的設定值（key -> value），提供與 SettingsManager 相同的型別轉換。"""
+
+    def get_int(self, key: str, default: Optional[int] = None) -> int:
+        return _to_int(self.get(key, default), default)
+
+    def get_bool(self, key: str, default: Optional[bool] = None) -> bool:
+        return _to_bool(self.get(key, default))
+
+    def get_str(self, key: str, default: str = "") -> str:
+        return _to_str(self.get(key), default)
+
+    def differs(self, key: str, value: Any) -> bool:
+        """value 是否與快照中的值不同（INI 讀回的是字串，依 value 的型別比較）。"""
+        if key not in self:
+            return True
+        if isinstance(value, bool):
+            return self.get_bool(key) != value
+        return str(self[key]) != str(value)
+
+
 class SettingsManager(QObject):
     settings_changed = Signal()
 
@@ -38,6 +74,7 @@ class SettingsManager(QObject):
         # 圖片
         "Image/Format": "PNG",
         "Image/MaxSize": 2048,
+        "Image/Quality": 85,
         "Image/RetainOriginal": True,
 
         # AI（通用）
@@ -58,6 +95,10 @@ class SettingsManager(QObject):
         super().__init__(parent)
         self._settings: Optional[QSettings] = None
         self._migrated: bool = False
+        # batch() 期間暫存的寫入；None 表示直接寫入 QSettings
+        self._batch: Optional[Dict[str, Any]] = None
+        # 最近一次 settings_changed 所變更的 key；None 表示未知（視為全部變更）
+        self.changed_keys: Optional[frozenset] = None
 
     @property
     def settings(self) -> QSettings:
@@ -76,16 +117,14 @@ class SettingsManager(QObject):
 
     # ---- 基本 API（型別安全） ----
     def get(self, key: str, default: Any = None) -> Any:
+        if self._batch is not None and key in self._batch:
+            return self._batch[key]
         if default is None and key in self.DEFAULTS:
             default = self.DEFAULTS[key]
         return self.settings.value(key, default)
 
     def get_int(self, key: str, default: Optional[int] = None) -> int:
-        v = self.get(key, default)
-        try:
-            return int(v)
-        except Exception:
-            return int(default or 0)
+        return _to_int(self.get(key, default), default)
 
     def get_float(self, key: str, default: Optional[float] = None) -> float:
         v = self.get(key, default)
@@ -94,20 +133,58 @@ class SettingsManager(QObject):
         except Exception:
             return float(default or 0.0)
 
+    def get_str(self, key: str, default: str = "") -> str:
+        """字串設定；未設定或為空字串時回傳 default。"""
+        return _to_str(self.get(key), default)
+
     def get_bool(self, key: str, default: Optional[bool] = None) -> bool:
         if default is None and key in self.DEFAULTS:
             default = bool(self.DEFAULTS[key])
         v = self.get(key, default)
         return _to_bool(v)
 
+    def snapshot(self) -> SettingsSnapshot:
+        """
+        一次讀出所有設定（含預設值），供需要大量讀值的地方（例如設定視窗）使用，
+        不必每個 key 各走一次 QSettings。
+        """
+        s = self.settings
+        snap = SettingsSnapshot(self.DEFAULTS)
+        snap.update({k: s.value(k) for k in s.allKeys()})
+        return snap
+
     def set(self, key: str, value: Any) -> None:
+        if self._batch is not None:
+            self._batch[key] = value
+            return
         self.settings.setValue(key, value)
 
     def set_many(self, pairs: Dict[str, Any]) -> None:
+        if self._batch is not None:
+            self._batch.update(pairs)
+            return
         s = self.settings
         for k, v in pairs.items():
             s.setValue(k, v)
 
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        期間的 set()/set_many() 先暫存，結束時一次寫入並 sync()；
+        區塊內發生例外則全部捨棄，不會留下寫到一半的設定。
+        """
+        if self._batch is not None:
+            yield   # 已在 batch 中：併入外層
+            return
+        self._batch = {}
+        try:
+            yield
+            pending, self._batch = self._batch, None
+            self.set_many(pending)
+            self.settings.sync()
+        finally:
+            self._batch = None
+
     def remove(self, key: str) -> None:
         self.settings.remove(key)
 
@@ -115,12 +192,26 @@ class SettingsManager(QObject):
         self.settings.clear()
         self.save_and_emit()
 
-    def save_and_emit(self) -> None:
+    def save_and_emit(self, changed_keys=None) -> None:
+        """changed_keys：本次變更的 key，讓接收端可用 touched() 略過無關的重新設定。"""
         if self._settings is not None:
             self._settings.sync()
         self._settings = None
+        self.changed_keys = frozenset(changed_keys) if changed_keys is not None else None
         self.settings_changed.emit()
 
+    def touched(self, *keys: str) -> bool:
+        """
+        最近一次變更是否涉及指定的 key；以 "/" 結尾者視為整個群組（例如 "AI/"）。
+        變更範圍未知時一律回傳 True。
+        """
+        if self.changed_keys is None:
+            return True
+        return any(
+            k == p or (p.endswith("/") and k.startswith(p))
+            for p in keys for k in self.changed_keys
+        )
+
     # ---- 業務便利 ----
     def get_hotkeys(self) -> Dict[str, str]:
         return {
@@ -133,6 +224,7 @@ class SettingsManager(QObject):
         return {
             "format": str(self.get("Image/Format")),
             "max_size": self.get_int("Image/MaxSize"),
+            "quality": self.get_int("Image/Quality"),
             "retain_original": self.get_bool("Image/RetainOriginal"),
         }
 
@@ -122,6 +122,8 @@ class HotkeyManager(QObject):
 
     def reload_hotkeys(self):
         """Safely reloads hotkeys by invoking the method in the listener's thread."""
+        if not settings_manager.touched("Hotkeys/"):
+            return
         logger.info("Settings changed, queuing hotkey listener restart.")
         if self.thread.isRunning():
             # Use invokeMethod to ensure start_listening runs safely in the correct thread context
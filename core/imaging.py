@@ -1,13 +1,20 @@
 # core/imaging.py
 from __future__ import annotations
+import asyncio
+import functools
+import importlib
+import io
+import os
+import sys
 import time
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Union
 
-from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
-from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, Signal, Slot
+from PySide6.QtGui import QImage, QImageWriter, QPixmap
 
 # ========= PIL 轉換工具 =========
 
@@ -15,28 +22,58 @@ def pil_to_qpixmap(pil_image) -> QPixmap:
     """
     將 Pillow Image 轉為 QPixmap。
     - 會自動轉成 RGBA，避免調色盤/灰階模式造成相容問題。
+    - 直接以原始像素 buffer 建立 QImage，不經過 PNG 編碼/解碼。
     - 需要安裝 pillow：pip install pillow
     """
     from PIL import Image
-    from PIL.ImageQt import ImageQt  # Pillow 9+
     if not isinstance(pil_image, Image.Image):
         raise TypeError("pil_to_qpixmap 需要 Pillow Image 物件")
     if pil_image.mode not in ("RGB", "RGBA"):
         pil_image = pil_image.convert("RGBA")
-    qt_img = ImageQt(pil_image)  # 這會回傳 PySide6 的 QImage 相容物件
-    if isinstance(qt_img, QImage):
-        qimg = qt_img
+    w, h = pil_image.size
+    if pil_image.mode == "RGBA":
+        data = pil_image.tobytes("raw", "RGBA")
+        qimg = QImage(data, w, h, 4 * w, QImage.Format.Format_RGBA8888)
     else:
-        qimg = QImage(qt_img)
+        data = pil_image.tobytes("raw", "RGB")
+        qimg = QImage(data, w, h, 3 * w, QImage.Format.Format_RGB888)
+    # fromImage 會複製像素，data 只需存活到這一行結束
     return QPixmap.fromImage(qimg)
 
+# QImage 格式 -> (PIL mode, raw 解碼模式)；命中者直接解 constBits()，不走 PNG
+_FORMAT_DISPATCH = {
+    QImage.Format.Format_RGBA8888: ("RGBA", "RGBA"),
+    QImage.Format.Format_RGBX8888: ("RGB", "RGBX"),
+    QImage.Format.Format_RGB888: ("RGB", "RGB"),
+    QImage.Format.Format_Grayscale8: ("L", "L"),
+}
+if sys.byteorder == "little":
+    # 0xAARRGGBB 在 little-endian 記憶體中為 B,G,R,A
+    _FORMAT_DISPATCH[QImage.Format.Format_ARGB32] = ("RGBA", "BGRA")
+    _FORMAT_DISPATCH[QImage.Format.Format_RGB32] = ("RGB", "BGRX")
+
+def qimage_to_pil(qimg: QImage):
+    """
+    將 QImage 轉為 Pillow Image。
+    - 常見格式依 _FORMAT_DISPATCH 直接解碼像素 buffer（一次複製）；
+      其他格式先由 Qt 轉成 RGBA8888 再解碼。
+    """
+    from PIL import Image
+    spec = _FORMAT_DISPATCH.get(qimg.format())
+    if spec is None:
+        qimg = qimg.convertToFormat(QImage.Format.Format_RGBA8888)
+        spec = ("RGBA", "RGBA")
+    mode, rawmode = spec
+    return Image.frombytes(
+        mode, (qimg.width(), qimg.height()), qimg.constBits(),
+        "raw", rawmode, qimg.bytesPerLine(), 1,
+    )
+
 def qpixmap_to_pil(pix: QPixmap):
     """
     將 QPixmap 轉為 Pillow Image（方便做進一步處理或轉檔）。
     """
-    from PIL.ImageQt import ImageQt
-    qimg = pix.toImage()
-    return ImageQt(qimg).copy()  # Pillow Image
+    return qimage_to_pil(pix.toImage())
 
 
 # ========= 存檔實用工具 =========
@@ -46,13 +83,19 @@ def _timestamp_name() -> str:
     now = datetime.now()
     return now.strftime("%Y%m%d_%H%M%S_") + f"{int(now.microsecond/1000):03d}"
 
-def _ensure_dir(base: str, use_date_subdir: bool = True) -> Path:
+@functools.lru_cache(maxsize=32)
+def _ensure_dir_cached(base: str, date_str: str) -> Path:
+    # 同一 (base, 日期) 只 mkdir 一次；連拍時不再每張都 stat 目錄
     base_path = Path(base)
-    if use_date_subdir:
-        base_path = base_path / datetime.now().strftime("%Y-%m-%d")
+    if date_str:
+        base_path = base_path / date_str
     base_path.mkdir(parents=True, exist_ok=True)
     return base_path
 
+def _ensure_dir(base: str, use_date_subdir: bool = True) -> Path:
+    date_str = datetime.now().strftime("%Y-%m-%d") if use_date_subdir else ""
+    return _ensure_dir_cached(base, date_str)
+
 def _qimage_from_any(img: Union[QImage, QPixmap, str]) -> QImage:
     if isinstance(img, QImage):
         return img
@@ -65,21 +108,96 @@ def _qimage_from_any(img: Union[QImage, QPixmap, str]) -> QImage:
         return q
     raise TypeError("Unsupported image type; expected QImage/QPixmap/str(path).")
 
-def _qt_save(image: QImage, out_path: Path, fmt_upper: str) -> bool:
+# Qt 的 PNG quality 換算為 zlib 等級 (100 - q) * 9 / 91；89 -> 等級 1（最快且仍有壓縮）
+_PNG_FAST_QUALITY = 89
+
+def _qt_save(image: QImage, out_path: Path, fmt_upper: str, quality: int = -1) -> bool:
+    try:
+        if fmt_upper == "PNG":
+            # PNG 無損，有損品質設定對它沒有意義；截圖以存檔速度為優先
+            writer = QImageWriter(str(out_path), b"PNG")
+            writer.setQuality(_PNG_FAST_QUALITY)
+            return writer.write(image)
+        return image.save(str(out_path), fmt_upper, quality)
+    except Exception:
+        return False
+
+def _pil_save(image: QImage, out_path: Path, fmt_upper: str, quality: int = 85) -> bool:
     try:
-        return image.save(str(out_path), fmt_upper)
+        pil = qimage_to_pil(image)           # 轉成 PIL Image（不經 PNG）
     except Exception:
         return False
+    return _pil_write(pil, out_path, fmt_upper, quality)
+
+# 估計色數時的最近鄰取樣間隔（邊長 1/8，約 1/64 像素）
+_PALETTE_SAMPLE_STEP = 8
+
+def _sample_size(w: int, h: int) -> tuple[int, int] | None:
+    step = _PALETTE_SAMPLE_STEP
+    if w < step * 16 or h < step * 16:
+        return None   # 小圖直接整張計算
+    return w // step, h // step
 
-def _pil_save(image: QImage, out_path: Path, fmt_upper: str) -> bool:
+def _to_palette_if_few_colors(pil, check_sample: bool = True):
+    """
+    圖表/終端機類截圖常少於 256 色：轉成調色盤 (P) 影像，每像素 4 bytes -> 1 byte，
+    zlib 要壓的資料量與檔案大小都大幅下降。色數超過或含半透明時回傳 None。
+    check_sample=True 時先以取樣估計，照片類截圖不必掃描整張。
+    """
+    from PIL import Image
+    if check_sample:
+        size = _sample_size(*pil.size)
+        if size and pil.resize(size, Image.Resampling.NEAREST).getcolors(256) is None:
+            return None
+    if pil.mode == "RGBA":
+        if pil.getchannel("A").getextrema() != (255, 255):
+            return None
+        pil = pil.convert("RGB")
+    elif pil.mode != "RGB":
+        return None
+    colors = pil.getcolors(256)   # 超過 256 色即提早回傳 None
+    if colors is None:
+        return None
+    return pil.convert("P", palette=Image.Palette.ADAPTIVE, colors=len(colors))
+
+def _palette_png_save(image: QImage, out_path: Path) -> bool:
+    try:
+        # 先在 Qt 端最近鄰縮小取樣；取樣就超過 256 色時不做整張 PIL 轉換
+        size = _sample_size(image.width(), image.height())
+        if size:
+            sample = image.scaled(size[0], size[1], Qt.AspectRatioMode.IgnoreAspectRatio,
+                                  Qt.TransformationMode.FastTransformation)
+            if qimage_to_pil(sample).getcolors(256) is None:
+                return False
+        pal = _to_palette_if_few_colors(qimage_to_pil(image), check_sample=False)
+    except Exception:
+        return False
+    if pal is None:
+        return False
+    return _pil_write(pal, out_path, "PNG")
+
+def _pil_write(pil, out_path: Path, fmt_upper: str, quality: int = 85) -> bool:
     try:
-        from PIL.ImageQt import fromqimage   # Pillow 9+
-        pil = fromqimage(image)              # 轉成 PIL Image
         fmt = "JPEG" if fmt_upper in ("JPG", "JPEG") else fmt_upper
+        if fmt == "PNG":
+            pil = _to_palette_if_few_colors(pil) or pil
+        # PNG / WebP 原生支援 alpha，只有不支援的格式才轉 RGB（省一次整張轉換）
+        if pil.mode == "RGBA" and fmt not in ("PNG", "WEBP"):
+            pil = pil.convert("RGB")
+        # 先在記憶體中編碼完再一次寫檔：Pillow 直接寫檔會以小區塊多次 write，
+        # 且編碼失敗時不會留下寫到一半的檔案
+        buf = io.BytesIO()
         if fmt == "WEBP":
-            pil.save(str(out_path), format=fmt, quality=95, method=6)
+            # method=4（Pillow 預設）：method 5/6 多做的 RD 搜尋對截圖幾乎沒有收益，卻慢 2~3 倍
+            pil.save(buf, format=fmt, lossless=False, quality=quality, method=4)
+        elif fmt == "JPEG":
+            pil.save(buf, format=fmt, quality=quality, optimize=True)
+        elif fmt == "PNG":
+            # 與 Qt 路徑相同採 zlib 等級 1（_PNG_FAST_QUALITY）；optimize 會強制等級 9
+            pil.save(buf, format=fmt, compress_level=1)
         else:
-            pil.save(str(out_path), format=fmt, optimize=True)
+            pil.save(buf, format=fmt, optimize=True)
+        out_path.write_bytes(buf.getbuffer())
         return True
     except Exception:
         return False
@@ -90,6 +208,7 @@ def save_image_sync(
     preferred_ext: str = "webp",
     use_date_subdir: bool = True,
     prefix: str = "",
+    quality: int = 85,
 ) -> str:
     """
     同步存檔：將 QImage/QPixmap/檔案路徑 存成圖片檔。
@@ -102,19 +221,63 @@ def save_image_sync(
     out_path = out_dir / name
 
     fmt_upper = ext.upper()
-    ok = _qt_save(qimg, out_path, fmt_upper) or _pil_save(qimg, out_path, fmt_upper)
+    ok = (
+        (fmt_upper == "PNG" and _palette_png_save(qimg, out_path))
+        or _qt_save(qimg, out_path, fmt_upper, quality)
+        or _pil_save(qimg, out_path, fmt_upper, quality)
+    )
     if not ok:
+        if not out_dir.is_dir():
+            # 快取的目錄可能在執行期間被刪除：清快取後重建
+            _ensure_dir_cached.cache_clear()
+            out_dir = _ensure_dir(base_dir, use_date_subdir)
         # 若仍失敗則退回 PNG
         out_path = out_dir / ((prefix or "") + _timestamp_name() + ".png")
         _qt_save(qimg, out_path, "PNG") or _pil_save(qimg, out_path, "PNG")
     return str(out_path)
 
+def save_ndarray_sync(
+    arr,
+    base_dir: str,
+    preferred_ext: str = "webp",
+    use_date_subdir: bool = True,
+    prefix: str = "",
+    quality: int = 85,
+) -> str:
+    """
+    同步存檔：將 HxWx4 (BGRA，截圖格式) 或 HxWx3 (RGB) ndarray 以 Pillow 存檔。
+    不依賴 Qt，可在子行程 (ProcessPoolExecutor) 中執行。
+    回傳：完整檔案路徑。
+    """
+    from PIL import Image
+    if arr.dtype.itemsize != 1 or arr.dtype.kind != "u":
+        arr = arr.clip(0, 255).astype("uint8")
+    h, w = arr.shape[:2]
+    if arr.ndim == 3 and arr.shape[2] == 4:
+        pil = Image.frombuffer("RGBA", (w, h), arr, "raw", "BGRA", arr.strides[0], 1)
+    elif arr.ndim == 3 and arr.shape[2] == 3:
+        pil = Image.frombuffer("RGB", (w, h), arr, "raw", "RGB", arr.strides[0], 1)
+    else:
+        raise ValueError(f"Unsupported ndarray shape: {arr.shape}")
+
+    out_dir = _ensure_dir(base_dir, use_date_subdir)
+    ext = preferred_ext.lower().lstrip(".")
+    out_path = out_dir / ((prefix or "") + _timestamp_name() + f".{ext}")
+    if not _pil_write(pil, out_path, ext.upper(), quality):
+        if not out_dir.is_dir():
+            _ensure_dir_cached.cache_clear()
+            out_dir = _ensure_dir(base_dir, use_date_subdir)
+        out_path = out_dir / ((prefix or "") + _timestamp_name() + ".png")
+        if not _pil_write(pil, out_path, "PNG"):
+            raise OSError(f"無法寫入影像：{out_path}")
+    return str(out_path)
+
 
 # ========= 背景存檔 Worker =========
 
 class _ImageSaveSignals(QObject):
     started = Signal()
-    finished = Signal(str, float)   # (saved_path, elapsed_ms)
+    finished = Signal(str, float, object)   # (saved_path, elapsed_ms, thumbnail QImage | None)
     error = Signal(str)
 
 @dataclass
@@ -123,13 +286,35 @@ class ImageSaveOptions:
     preferred_ext: str = "webp"
     use_date_subdir: bool = True
     prefix: str = ""
+    quality: int = 85   # WebP/JPEG 有損品質 0~100
+    thumbnail_size: int = 0   # >0 時順便在背景產生縮圖（免得之後再從檔案讀回解碼）
+
+def _make_thumbnail(qimg: QImage, size: int) -> QImage | None:
+    if size <= 0 or qimg.isNull():
+        return None
+    return qimg.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+def _ndarray_thumbnail(arr, size: int) -> QImage | None:
+    """由 BGRA/RGB ndarray 產生縮圖（包住原記憶體後縮放，縮放結果為獨立的 QImage）。"""
+    if size <= 0 or arr.ndim != 3 or arr.dtype.itemsize != 1:
+        return None
+    h, w, c = arr.shape
+    if c == 4:
+        fmt = QImage.Format.Format_RGB32 if sys.byteorder == "little" else None
+    elif c == 3:
+        fmt = QImage.Format.Format_RGB888
+    else:
+        fmt = None
+    if fmt is None or not arr.flags["C_CONTIGUOUS"]:
+        return None
+    return _make_thumbnail(QImage(arr.data, w, h, arr.strides[0], fmt), size)
 
 class ImageSaveWorker(QRunnable):
     """
     將影像在背景執行緒存檔。
     事件：
       - signals.started()
-      - signals.finished(path: str, elapsed_ms: float)
+      - signals.finished(path: str, elapsed_ms: float, thumbnail: QImage | None)
       - signals.error(msg: str)
     """
     def __init__(self, image: Union[QImage, QPixmap, str], opts: ImageSaveOptions):
@@ -144,26 +329,132 @@ class ImageSaveWorker(QRunnable):
         self.signals.started.emit()
         t0 = time.perf_counter()
         try:
+            qimg = _qimage_from_any(self._image)
             saved = save_image_sync(
-                self._image,
+                qimg,
                 base_dir=self._opts.base_dir,
                 preferred_ext=self._opts.preferred_ext,
                 use_date_subdir=self._opts.use_date_subdir,
                 prefix=self._opts.prefix,
+                quality=self._opts.quality,
             )
             ms = (time.perf_counter() - t0) * 1000.0
-            self.signals.finished.emit(saved, ms)
+            self.signals.finished.emit(saved, ms, _make_thumbnail(qimg, self._opts.thumbnail_size))
         except Exception as e:
             self.signals.error.emit(str(e))
 
+# 存檔（編碼＋寫檔）專用執行緒池：以磁碟 I/O 為主，執行緒過多只會互搶 SSD 與快取
+_SAVE_POOL: QThreadPool | None = None
+
+def _get_save_pool() -> QThreadPool:
+    global _SAVE_POOL
+    if _SAVE_POOL is None:
+        _SAVE_POOL = QThreadPool()
+        _SAVE_POOL.setObjectName("image-save")
+        _SAVE_POOL.setMaxThreadCount(min(4, os.cpu_count() or 2))
+    return _SAVE_POOL
+
+# 多張連拍時的編碼 process pool：繞過 GIL。上限與存檔執行緒池相同（以磁碟 I/O 為主）
+_ENCODE_POOL: ProcessPoolExecutor | None = None
+_ENCODE_WORKERS = min(4, os.cpu_count() or 2)
+
+def _get_encode_pool() -> ProcessPoolExecutor:
+    global _ENCODE_POOL
+    if _ENCODE_POOL is None:
+        _ENCODE_POOL = ProcessPoolExecutor(max_workers=_ENCODE_WORKERS)
+    return _ENCODE_POOL
+
+def _warm_encode_worker() -> None:
+    # 子行程預先載入 Pillow，第一張連拍不必等 import
+    importlib.import_module("PIL.Image")
+
+def warm_encode_pool() -> None:
+    """
+    啟動時預先建立編碼子行程（Windows spawn + 子行程 import 成本高），
+    避免第一張連拍才付出這段延遲。須在 multiprocessing.freeze_support() 之後呼叫。
+    """
+    pool = _get_encode_pool()
+    for _ in range(_ENCODE_WORKERS):
+        pool.submit(_warm_encode_worker)
+
+def _is_ndarray(obj) -> bool:
+    # 不在模組載入時 import numpy，只以 array 介面判斷
+    return hasattr(obj, "__array_interface__") and hasattr(obj, "strides")
+
+def _submit_ndarray(arr, opts: ImageSaveOptions) -> Future:
+    """
+    送 process pool 編碼；回傳的 Future 結果為 (saved_path, elapsed_ms, thumbnail)，
+    失敗時為 OSError。完成回呼在 executor 管理執行緒上執行。
+    """
+    t0 = time.perf_counter()
+    result: Future = Future()
+    fut = _get_encode_pool().submit(
+        save_ndarray_sync, arr,
+        opts.base_dir, opts.preferred_ext, opts.use_date_subdir, opts.prefix, opts.quality,
+    )
+
+    def _done(f):
+        try:
+            saved = f.result()
+        except Exception as e:
+            result.set_exception(OSError(str(e)))
+            return
+        ms = (time.perf_counter() - t0) * 1000.0
+        try:
+            thumb = _ndarray_thumbnail(arr, opts.thumbnail_size)
+        except Exception:
+            thumb = None
+        result.set_result((saved, ms, thumb))
+
+    fut.add_done_callback(_done)
+    return result
+
+# 跨執行緒 signal 的發送端必須存活到 GUI 執行緒收到為止；完成前保留參照
+_PENDING_RELAYS: set[_ImageSaveSignals] = set()
+
+def _save_ndarray_in_process(arr, opts: ImageSaveOptions, on_done, on_error, on_started):
+    signals = _ImageSaveSignals()
+    if on_started:
+        signals.started.connect(on_started)
+    if on_done:
+        signals.finished.connect(on_done)
+    if on_error:
+        signals.error.connect(on_error)
+    # 在使用者回呼之後才釋放（同執行緒內依連線順序呼叫）
+    signals.finished.connect(lambda *_: _PENDING_RELAYS.discard(signals))
+    signals.error.connect(lambda *_: _PENDING_RELAYS.discard(signals))
+    _PENDING_RELAYS.add(signals)
+
+    signals.started.emit()
+    fut = _submit_ndarray(arr, opts)
+
+    def _done(f):
+        # 於 executor 管理執行緒回呼；signal 會排入 GUI 執行緒
+        try:
+            saved, ms, thumb = f.result()
+        except Exception as e:
+            signals.error.emit(str(e))
+            return
+        signals.finished.emit(saved, ms, thumb)
+
+    fut.add_done_callback(_done)
+    return fut
+
 def save_image_async(
-    image: Union[QImage, QPixmap, str],
+    image,
     opts: ImageSaveOptions,
     on_done=None, on_error=None, on_started=None,
+    copy: bool = False,
 ):
     """
     便利函式：啟動背景存檔並綁定回呼。
+    - QImage/QPixmap/路徑：交給 QThreadPool（QImage 無法 pickle）。
+    - ndarray (BGRA/RGB)：送 process pool 編碼，適合連拍。
+      送往子行程時會 pickle 一份，但 pickle 發生在 executor 的背景執行緒；
+      呼叫端若會立即改寫該 buffer，需傳 copy=True（或自行先複製）。
     """
+    if _is_ndarray(image):
+        return _save_ndarray_in_process(image.copy() if copy else image, opts, on_done, on_error, on_started)
     worker = ImageSaveWorker(image, opts)
     if on_started:
         worker.signals.started.connect(on_started)
@@ -171,5 +462,32 @@ def save_image_async(
         worker.signals.finished.connect(on_done)
     if on_error:
         worker.signals.error.connect(on_error)
-    QThreadPool.globalInstance().start(worker)
+    _get_save_pool().start(worker)
     return worker
+
+async def save_image(image, opts: ImageSaveOptions, on_started=None, copy: bool = False):
+    """
+    協程版 save_image_async：在 qasync 事件圈中 await 背景存檔結果，
+    仍沿用同一套 QThreadPool / process pool 分派。
+    回傳 (saved_path, elapsed_ms, thumbnail)；失敗時拋出 OSError。
+    """
+    if _is_ndarray(image):
+        # process pool 的結果直接以 concurrent Future 交回事件圈，不經 signal 轉送
+        if on_started:
+            on_started()
+        return await asyncio.wrap_future(_submit_ndarray(image.copy() if copy else image, opts))
+
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+
+    # 回呼經由 signal 排入 GUI 執行緒（即 qasync 事件圈所在執行緒），可直接設定 future
+    def _done(path: str, ms: float, thumb):
+        if not fut.done():
+            fut.set_result((path, ms, thumb))
+
+    def _error(msg: str):
+        if not fut.done():
+            fut.set_exception(OSError(msg))
+
+    save_image_async(image, opts, on_done=_done, on_error=_error, on_started=on_started, copy=copy)
+    return await fut
@@ -1,10 +1,14 @@
 # core/screenshot.py
+from __future__ import annotations
 import sys
 import mss
 import mss.tools
-import numpy as np
 import time
 import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +19,12 @@ wintypes = None
 Structure = None
 byref = None
 sizeof = None # ADDED: sizeof needs to be imported
+_BITMAPINFOHEADER = None
+
+# PrintWindow flag (Windows 8.1+): render DWM-composed content, even when occluded
+PW_RENDERFULLCONTENT = 2
+DIB_RGB_COLORS = 0
+BI_RGB = 0
 
 # Platform specific initialization
 if sys.platform == "win32":
@@ -22,8 +32,43 @@ if sys.platform == "win32":
         import win32gui
         # We still need ctypes for the DWM API calls (DwmGetWindowAttribute)
         # FIX: Explicitly import sizeof
-        from ctypes import windll, wintypes, Structure, byref, sizeof
-        
+        from ctypes import windll, wintypes, Structure, byref, sizeof, c_void_p
+
+        class _BitmapInfoHeader(Structure):
+            _fields_ = [
+                ("biSize", wintypes.DWORD),
+                ("biWidth", wintypes.LONG),
+                ("biHeight", wintypes.LONG),
+                ("biPlanes", wintypes.WORD),
+                ("biBitCount", wintypes.WORD),
+                ("biCompression", wintypes.DWORD),
+                ("biSizeImage", wintypes.DWORD),
+                ("biXPelsPerMeter", wintypes.LONG),
+                ("biYPelsPerMeter", wintypes.LONG),
+                ("biClrUsed", wintypes.DWORD),
+                ("biClrImportant", wintypes.DWORD),
+            ]
+
+        _BITMAPINFOHEADER = _BitmapInfoHeader
+
+        # Declare handle-sized return/arg types so 64-bit handles are not truncated to int
+        windll.user32.GetWindowDC.restype = wintypes.HDC
+        windll.user32.GetWindowDC.argtypes = [wintypes.HWND]
+        windll.user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+        windll.user32.PrintWindow.argtypes = [wintypes.HWND, wintypes.HDC, wintypes.UINT]
+        windll.gdi32.CreateCompatibleDC.restype = wintypes.HDC
+        windll.gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+        windll.gdi32.CreateCompatibleBitmap.restype = wintypes.HBITMAP
+        windll.gdi32.CreateCompatibleBitmap.argtypes = [wintypes.HDC, wintypes.INT, wintypes.INT]
+        windll.gdi32.SelectObject.restype = wintypes.HGDIOBJ
+        windll.gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+        windll.gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+        windll.gdi32.DeleteDC.argtypes = [wintypes.HDC]
+        windll.gdi32.GetDIBits.argtypes = [
+            wintypes.HDC, wintypes.HBITMAP, wintypes.UINT, wintypes.UINT,
+            c_void_p, c_void_p, wintypes.UINT,
+        ]
+
     except ImportError:
         logger.warning("pywin32 or ctypes imports failed. Active window capture will be less accurate on Windows.")
         # Ensure they remain None if import fails
@@ -35,17 +80,30 @@ if sys.platform == "win32":
         windll = None
 
 def capture_region(monitor_dict: dict) -> np.ndarray | None:
-    """Captures a specific region and returns it as a BGRA NumPy array."""
+    """
+    Captures a specific region and returns it as a BGRA NumPy array.
+    The array wraps mss's freshly allocated pixels without a copy; nothing else writes to it.
+    """
+    # NumPy is imported on first capture rather than at app start-up
+    import numpy as np
     try:
         with mss.mss() as sct:
             sct_img = sct.grab(monitor_dict)
-            # Efficient conversion to NumPy array (BGRA format)
-            img = np.array(sct_img)
-            return img
+            shape = (sct_img.height, sct_img.width, 4)
+            return np.frombuffer(sct_img.raw, np.uint8).reshape(shape)
     except Exception as e:
         logger.error(f"Error during region capture: {e}")
         return None
 
+def foreground_window_handle() -> int | None:
+    """Returns the HWND of the foreground window, or None where it cannot be queried."""
+    if sys.platform == "win32" and win32gui:
+        try:
+            return int(win32gui.GetForegroundWindow()) or None
+        except Exception:
+            return None
+    return None
+
 def capture_active_window() -> np.ndarray | None:
     """Attempts to capture the currently active (foreground) window."""
     # Small delay to ensure the correct window is focused if triggered by hotkey
@@ -111,9 +169,85 @@ def _capture_active_window_win32() -> np.ndarray | None:
         if width <= 0 or height <= 0:
             return None
 
+        # Fast path: PrintWindow renders only the window itself (no desktop crop,
+        # works when occluded). Some hardware-accelerated apps return 0 -> mss fallback.
+        try:
+            img = _print_window_win32(hwnd, x, y, width, height)
+            if img is not None:
+                return img
+        except Exception as e:
+            logger.info(f"PrintWindow capture failed ({e}), falling back to mss.")
+
         monitor = {"top": y, "left": x, "width": width, "height": height}
         return capture_region(monitor)
 
     except Exception as e:
         logger.error(f"Error during Win32 active window capture: {e}")
-        return None
\ No newline at end of file
+        return None
+
+# Compatible bitmap reused across PrintWindow calls, keyed by (width, height)
+_pw_bitmap_size = None
+_pw_bitmap = None
+
+def _get_print_window_bitmap(hdc, width: int, height: int):
+    global _pw_bitmap_size, _pw_bitmap
+    if _pw_bitmap is not None and _pw_bitmap_size == (width, height):
+        return _pw_bitmap
+    if _pw_bitmap is not None:
+        windll.gdi32.DeleteObject(_pw_bitmap)
+        _pw_bitmap = None
+    bmp = windll.gdi32.CreateCompatibleBitmap(hdc, width, height)
+    if not bmp:
+        raise OSError("CreateCompatibleBitmap failed.")
+    _pw_bitmap, _pw_bitmap_size = bmp, (width, height)
+    return bmp
+
+def _print_window_win32(hwnd, x: int, y: int, width: int, height: int) -> np.ndarray | None:
+    """Captures the window via PrintWindow + GetDIBits and crops it to the given screen rect (BGRA)."""
+    if _BITMAPINFOHEADER is None:
+        return None
+    import numpy as np
+    # PrintWindow draws the full window rect (incl. invisible resize borders);
+    # the DWM bounds are cropped out of it afterwards.
+    wx, wy, wx2, wy2 = win32gui.GetWindowRect(hwnd)
+    win_w, win_h = wx2 - wx, wy2 - wy
+    if win_w <= 0 or win_h <= 0:
+        return None
+
+    user32, gdi32 = windll.user32, windll.gdi32
+    hwnd_dc = user32.GetWindowDC(hwnd)
+    if not hwnd_dc:
+        return None
+    mem_dc = gdi32.CreateCompatibleDC(hwnd_dc)
+    try:
+        bmp = _get_print_window_bitmap(hwnd_dc, win_w, win_h)
+        old = gdi32.SelectObject(mem_dc, bmp)
+        try:
+            ok = user32.PrintWindow(hwnd, mem_dc, PW_RENDERFULLCONTENT)
+        finally:
+            # GetDIBits requires the bitmap to be deselected from any DC
+            gdi32.SelectObject(mem_dc, old)
+        if not ok:
+            return None
+
+        bmi = _BITMAPINFOHEADER()
+        bmi.biSize = sizeof(_BITMAPINFOHEADER)
+        bmi.biWidth = win_w
+        bmi.biHeight = -win_h  # negative -> top-down rows
+        bmi.biPlanes = 1
+        bmi.biBitCount = 32
+        bmi.biCompression = BI_RGB
+
+        buf = np.empty((win_h, win_w, 4), np.uint8)
+        lines = gdi32.GetDIBits(mem_dc, bmp, 0, win_h, buf.ctypes.data, byref(bmi), DIB_RGB_COLORS)
+        if lines != win_h:
+            return None
+    finally:
+        gdi32.DeleteDC(mem_dc)
+        user32.ReleaseDC(hwnd, hwnd_dc)
+
+    # GDI leaves the alpha byte undefined (often 0); force opaque like mss output
+    buf[..., 3] = 255
+    ox, oy = max(0, x - wx), max(0, y - wy)
+    # Callers wrap .data with a 4*width stride, so the crop must be contiguous
+    return np.ascontiguousarray(buf[oy:oy + height, ox:ox + width])
\ No newline at end of file
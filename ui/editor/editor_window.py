@@ -1,30 +1,61 @@
+import logging
+from contextlib import contextmanager
+from functools import partial
+
 import numpy as np
 from PySide6.QtWidgets import (
     QMainWindow, QGraphicsView, QGraphicsScene, QToolBar,
-    QColorDialog, QSpinBox, QLabel, QMessageBox, QGraphicsPixmapItem
+    QColorDialog, QSpinBox, QLabel, QMessageBox, QGraphicsItem,
+    QGraphicsEllipseItem, QGraphicsLineItem
 )
 from PySide6.QtGui import (
     QPixmap, QImage, QPainter, QKeySequence, QColor, QActionGroup, QAction, QUndoStack
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QTimer, QObject, QRunnable, QThreadPool, QRectF, Slot
 
 from ui.editor.tools import (
     RectangleTool, EllipseTool, LineTool, TextTool, ToolProperties, DeleteItemsCommand
 )
 from core.imaging import pil_to_qpixmap, ImageSaveWorker
 
+logger = logging.getLogger(__name__)
+
+def _has_antialiased_edges(image: QImage) -> bool:
+    """True if any pixel of a 32-bit ARGB image has partial alpha (i.e. an antialiased edge)."""
+    if image.isNull() or image.depth() != 32:
+        return False
+    arr = np.frombuffer(image.constBits(), np.uint8, count=image.sizeInBytes())
+    rows = arr.reshape(image.height(), image.bytesPerLine())[:, :image.width() * 4]
+    # ARGB32 is stored B,G,R,A on little-endian machines
+    alpha = rows[:, 3::4] if np.little_endian else rows[:, 0::4]
+    return bool(np.any((alpha > 0) & (alpha < 255)))
+
 class EditorView(QGraphicsView):
     def __init__(self, scene, parent=None):
         super().__init__(scene, parent)
-        self.setRenderHint(QPainter.RenderHint.Antialiasing)
+        # No geometry antialiasing while drawing interactively (mostly axis-aligned shapes);
+        # text AA is cheap and keeps labels readable. The saved image is rendered with AA.
+        self.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+        self.setRenderHint(QPainter.RenderHint.TextAntialiasing, True)
+        # Repaint only the exact region of the item being drawn/moved
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.MinimalViewportUpdate)
+        # Built-in items restore painter state themselves, and AA is off in the view
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontSavePainterState, True)
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontAdjustForAntialiasing, True)
         # Default mode allows selection/movement of items
         self.setDragMode(QGraphicsView.DragMode.RubberBandDrag)
         self.current_tool = None
+        # Mouse-move coalescing: skip repeated positions and apply at most one
+        # geometry update per event-loop pass
+        self._last_scene_pos = None
+        self._pending_pos = None
         # Access undo stack from parent window
         self.undo_stack = parent.undo_stack if parent else None
 
     def set_tool(self, tool):
         self.current_tool = tool
+        if tool is not None and self.undo_stack is not None:
+            tool.on_command = self.undo_stack.push
         # When drawing, disable dragging/selection
         if tool:
             self.setDragMode(QGraphicsView.DragMode.NoDrag)
@@ -36,6 +67,8 @@ class EditorView(QGraphicsView):
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton and self.current_tool:
             scene_pos = self.mapToScene(event.position().toPoint())
+            self._last_scene_pos = scene_pos
+            self._pending_pos = None
             self.current_tool.start(self.scene(), scene_pos)
             # TextTool finishes immediately
             if isinstance(self.current_tool, TextTool):
@@ -46,12 +79,24 @@ class EditorView(QGraphicsView):
     def mouseMoveEvent(self, event):
         if self.current_tool and not isinstance(self.current_tool, TextTool):
             scene_pos = self.mapToScene(event.position().toPoint())
-            self.current_tool.update(scene_pos)
+            if scene_pos == self._last_scene_pos:
+                return
+            self._last_scene_pos = scene_pos
+            if self._pending_pos is None:
+                QTimer.singleShot(0, self._flush_tool_update)
+            self._pending_pos = scene_pos
         else:
             super().mouseMoveEvent(event)
 
+    def _flush_tool_update(self):
+        pos, self._pending_pos = self._pending_pos, None
+        if pos is not None and self.current_tool:
+            self.current_tool.update(pos)
+
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton and self.current_tool and not isinstance(self.current_tool, TextTool):
+            # Apply the last coalesced position before committing the item
+            self._flush_tool_update()
             self.finish_tool()
         else:
             super().mouseReleaseEvent(event)
@@ -70,12 +115,42 @@ class EditorView(QGraphicsView):
             super().keyPressEvent(event)
 
     def delete_selected_items(self):
+        # The background is not selectable, so every selected item is an annotation
         selected_items = self.scene().selectedItems()
         if selected_items and self.undo_stack:
-             # Filter out the background if accidentally selected
-             items_to_delete = [item for item in selected_items if not isinstance(item, QGraphicsPixmapItem)]
-             if items_to_delete:
-                self.undo_stack.push(DeleteItemsCommand(self.scene(), items_to_delete))
+            self.undo_stack.push(DeleteItemsCommand(self.scene(), selected_items))
+
+
+class _CompositeSignals(QObject):
+    done = Signal(QImage)
+
+class _CompositeWorker(QRunnable):
+    """
+    Composites the pre-rendered annotation overlay onto the background in a
+    worker thread. Painting into a QImage is allowed off the GUI thread; the
+    scene itself is never touched here.
+    """
+    def __init__(self, target: QImage, background: QImage, overlay: QImage | None, offset, background_ref=None):
+        super().__init__()
+        self._target = target
+        self._background = background
+        # The array the background QImage wraps; the window may load a new image meanwhile
+        self._background_ref = background_ref
+        self._overlay = overlay
+        self._offset = offset
+        self.signals = _CompositeSignals()
+        self.setAutoDelete(True)
+
+    @Slot()
+    def run(self):
+        painter = QPainter(self._target)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        painter.drawImage(0, 0, self._background)
+        if self._overlay is not None:
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+            painter.drawImage(self._offset, self._overlay)
+        painter.end()
+        self.signals.done.emit(self._target)
 
 
 class ImageEditorWindow(QMainWindow):
@@ -88,11 +163,31 @@ class ImageEditorWindow(QMainWindow):
 
         self.undo_stack = QUndoStack(self)
         self.tool_properties = ToolProperties()
+        # Tools keep no per-stroke state between uses (TextTool hands its item off in
+        # end()), so one instance each is reused instead of allocating on every click.
+        self._tools = {
+            "rect": RectangleTool(self.tool_properties),
+            "ellipse": EllipseTool(self.tool_properties),
+            "line": LineTool(self.tool_properties),
+            "text": TextTool(self.tool_properties),
+        }
 
         self.scene = QGraphicsScene(self)
+        # Annotation scenes hold a handful of items that are added/moved constantly;
+        # a linear scan beats rebuilding the BSP index on every addItem/removeItem.
+        self.scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+        self._bg_item = None
+        self._background_image = None
+        self._save_buffer = None
         self.view = EditorView(self.scene, self)
         self.setCentralWidget(self.view)
 
+        # Coalesce bursts of resize events during a window drag into one fitInView
+        self._fit_timer = QTimer(self)
+        self._fit_timer.setSingleShot(True)
+        self._fit_timer.setInterval(50)
+        self._fit_timer.timeout.connect(self._fit_to_view)
+
         self.load_image(image_data)
         self.setup_toolbar()
 
@@ -101,19 +196,36 @@ class ImageEditorWindow(QMainWindow):
         self.action_select.setChecked(True)
 
     def load_image(self, image_data: np.ndarray):
+        """Shows a new screenshot; a reused window drops the previous image, annotations and history."""
+        if self._bg_item is not None:
+            self.view.finish_tool()
+            # Clear the stack first: its commands refer to items the scene is about to delete
+            self.undo_stack.clear()
+            self.scene.clear()
+            self._bg_item = None
         # Convert NumPy array (BGRA) to QImage
+        if not image_data.flags['C_CONTIGUOUS']:
+            image_data = np.ascontiguousarray(image_data)
         height, width, channel = image_data.shape
-        bytes_per_line = channel * width
-        # Use Format_ARGB32_Premultiplied for efficient rendering
-        q_image = QImage(image_data.data, width, height, bytes_per_line, QImage.Format.Format_ARGB32_Premultiplied)
+        bytes_per_line = image_data.strides[0]
+        # Screenshots are opaque: RGB32 lets Qt skip alpha blending when the background
+        # is drawn under the overlays. A sparse alpha sample keeps the check cheap.
+        if np.all(image_data[::64, ::64, 3] == 255) and image_data[-1, -1, 3] == 255:
+            fmt = QImage.Format.Format_RGB32
+        else:
+            fmt = QImage.Format.Format_ARGB32_Premultiplied
+        q_image = QImage(image_data.data, width, height, bytes_per_line, fmt)
 
-        # We must keep a reference to the QImage or copy it, otherwise the data might be garbage collected
-        self._image_ref = q_image.copy()
-        pixmap = QPixmap.fromImage(self._image_ref)
+        # The QImage wraps the ndarray's memory without copying; keep the array alive
+        # for as long as the image (and any pixmap sharing it) is in use.
+        self._image_ref = image_data
+        self._background_image = q_image
+        pixmap = QPixmap.fromImage(q_image)
 
         if not pixmap.isNull():
             # Background item should not be movable or selectable
-            background = self.scene.addPixmap(pixmap)
+            self._bg_item = self.scene.addPixmap(pixmap)
+            self._bg_item.setFlags(QGraphicsItem.GraphicsItemFlag(0))
             self.scene.setSceneRect(pixmap.rect().toRectF())
             self.resize(min(1200, pixmap.width() + 50), min(800, pixmap.height() + 100))
             self.view.fitInView(self.scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
@@ -128,31 +240,31 @@ class ImageEditorWindow(QMainWindow):
 
         self.action_select = QAction("選取/移動", self)
         self.action_select.setCheckable(True)
-        self.action_select.triggered.connect(lambda: self.select_tool(None))
+        self.action_select.triggered.connect(partial(self.select_tool, None))
         tool_group.addAction(self.action_select)
         toolbar.addAction(self.action_select)
 
         action_rect = QAction("矩形", self)
         action_rect.setCheckable(True)
-        action_rect.triggered.connect(lambda: self.select_tool(RectangleTool(self.tool_properties)))
+        action_rect.triggered.connect(partial(self.select_tool, self._tools["rect"]))
         tool_group.addAction(action_rect)
         toolbar.addAction(action_rect)
 
         action_ellipse = QAction("圓形/圈選", self)
         action_ellipse.setCheckable(True)
-        action_ellipse.triggered.connect(lambda: self.select_tool(EllipseTool(self.tool_properties)))
+        action_ellipse.triggered.connect(partial(self.select_tool, self._tools["ellipse"]))
         tool_group.addAction(action_ellipse)
         toolbar.addAction(action_ellipse)
 
         action_line = QAction("直線/箭頭", self)
         action_line.setCheckable(True)
-        action_line.triggered.connect(lambda: self.select_tool(LineTool(self.tool_properties)))
+        action_line.triggered.connect(partial(self.select_tool, self._tools["line"]))
         tool_group.addAction(action_line)
         toolbar.addAction(action_line)
 
         action_text = QAction("文字", self)
         action_text.setCheckable(True)
-        action_text.triggered.connect(lambda: self.select_tool(TextTool(self.tool_properties)))
+        action_text.triggered.connect(partial(self.select_tool, self._tools["text"]))
         tool_group.addAction(action_text)
         toolbar.addAction(action_text)
 
@@ -195,7 +307,8 @@ class ImageEditorWindow(QMainWindow):
         action_save.triggered.connect(self.save_and_close)
         toolbar.addAction(action_save)
 
-    def select_tool(self, tool_instance):
+    def select_tool(self, tool_instance, _checked=False):
+        # _checked: QAction.triggered passes its checked state through partial()
         # Update UI indicators based on the selected tool type
         if isinstance(tool_instance, TextTool):
             self.sb_size.setValue(self.tool_properties.font_size)
@@ -222,24 +335,112 @@ class ImageEditorWindow(QMainWindow):
         """Renders the scene to a QImage and emits the signal."""
         self.scene.clearSelection()
 
-        # Create QImage matching the scene size
-        image = QImage(self.scene.sceneRect().size().toSize(), QImage.Format.Format_ARGB32_Premultiplied)
-        image.fill(Qt.GlobalColor.transparent)
-
-        # Render scene
-        painter = QPainter(image)
-        self.scene.render(painter)
-        painter.end()
+        if self._background_image is not None and self._bg_item is not None:
+            # Only the annotations are rasterized here (the scene is GUI-thread only);
+            # the full-size background blit and composite run on a worker thread.
+            overlay, offset = self._render_overlay()
+            # Hand the buffer to the worker so it is not shared (and detached) meanwhile
+            target, self._save_buffer = self._get_save_buffer(), None
+            worker = _CompositeWorker(target, self._background_image, overlay, offset, self._image_ref)
+            worker.signals.done.connect(self._on_composite_done)
+            QThreadPool.globalInstance().start(worker)
+        else:
+            # Create QImage matching the scene size
+            image = QImage(self.scene.sceneRect().size().toSize(), QImage.Format.Format_ARGB32_Premultiplied)
+            image.fill(Qt.GlobalColor.transparent)
+
+            # Render scene
+            with self._items_uncached():
+                painter = QPainter(image)
+                painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+                self.scene.render(painter)
+                painter.end()
+            self._check_antialiased(image)
+            self.image_saved.emit(image)
 
-        self.image_saved.emit(image)
         self.undo_stack.setClean() # Mark as saved
         self.close()
 
+    def _render_overlay(self):
+        """Renders the annotation items (without background) into an image covering just their bounds."""
+        bounds = QRectF()
+        for item in self.scene.items():
+            if item is not self._bg_item:
+                bounds = bounds.united(item.sceneBoundingRect())
+        rect = bounds.intersected(self.scene.sceneRect()).toAlignedRect()
+        if rect.isEmpty():
+            return None, rect.topLeft()
+
+        overlay = QImage(rect.size(), QImage.Format.Format_ARGB32_Premultiplied)
+        overlay.fill(Qt.GlobalColor.transparent)
+        self._bg_item.setVisible(False)
+        try:
+            with self._items_uncached():
+                painter = QPainter(overlay)
+                painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+                self.scene.render(painter, QRectF(overlay.rect()), QRectF(rect))
+                painter.end()
+        finally:
+            self._bg_item.setVisible(True)
+        self._check_antialiased(overlay)
+        return overlay, rect.topLeft()
+
+    @contextmanager
+    def _items_uncached(self):
+        """
+        Finished items use ItemCoordinateCache, which is filled by the view's
+        non-antialiased paint; rendering through it would export those aliased
+        pixels. Paint the annotations directly for export, then restore the caches.
+        """
+        cached = [
+            (item, item.cacheMode()) for item in self.scene.items()
+            if item is not self._bg_item and item.cacheMode() != QGraphicsItem.CacheMode.NoCache
+        ]
+        for item, _ in cached:
+            item.setCacheMode(QGraphicsItem.CacheMode.NoCache)
+        try:
+            yield
+        finally:
+            for item, mode in cached:
+                item.setCacheMode(mode)
+
+    def _check_antialiased(self, image: QImage):
+        # Curved/diagonal annotations must come out with antialiased edges
+        def curved(item):
+            if isinstance(item, QGraphicsEllipseItem):
+                return True
+            if isinstance(item, QGraphicsLineItem):
+                line = item.line()
+                return line.dx() != 0 and line.dy() != 0
+            return False
+        if any(curved(item) for item in self.scene.items()) and not _has_antialiased_edges(image):
+            logger.warning("Exported annotations have no antialiased edge pixels")
+
+    def _on_composite_done(self, image: QImage):
+        self._save_buffer = image
+        self.image_saved.emit(image)
+
+    def _get_save_buffer(self) -> QImage:
+        # Reallocated only when the background size changes. The emitted image shares
+        # this buffer implicitly; painting into it again detaches if it is still in use.
+        size = self._background_image.size()
+        if self._background_image.format() == QImage.Format.Format_RGB32:
+            # Annotations over an opaque background stay opaque
+            fmt = QImage.Format.Format_RGB32
+        else:
+            fmt = QImage.Format.Format_ARGB32_Premultiplied
+        if self._save_buffer is None or self._save_buffer.size() != size or self._save_buffer.format() != fmt:
+            self._save_buffer = QImage(size, fmt)
+        return self._save_buffer
+
     def resizeEvent(self, event):
-        # Keep image aspect ratio when resizing the window
-        self.view.fitInView(self.scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+        # Keep image aspect ratio when resizing the window (debounced)
+        self._fit_timer.start()
         super().resizeEvent(event)
 
+    def _fit_to_view(self):
+        self.view.fitInView(self.scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+
     def closeEvent(self, event):
         if not self.undo_stack.isClean():
              reply = QMessageBox.question(self, '關閉編輯器',
@@ -1,20 +1,61 @@
-from PySide6.QtWidgets import QGraphicsItem, QGraphicsRectItem, QGraphicsEllipseItem, QGraphicsLineItem, QGraphicsTextItem
-from PySide6.QtGui import QUndoCommand, QPen, QBrush, QColor, QFont
+import time
+from contextlib import contextmanager
+
+from PySide6.QtWidgets import QGraphicsItem, QGraphicsRectItem, QGraphicsEllipseItem, QGraphicsLineItem, QGraphicsTextItem, QGraphicsScene
+from PySide6.QtGui import QUndoCommand, QPen, QBrush, QColor, QFont, QTextCursor, QPainter
 from PySide6.QtCore import QPointF, QLineF, Qt, QRectF
 
 # --- Tool Properties Container ---
 class ToolProperties:
     def __init__(self):
-        self.color = QColor(Qt.GlobalColor.red)
-        self.line_width = 3
-        self.font_size = 16
+        self._color = QColor(Qt.GlobalColor.red)
+        self._line_width = 3
+        self._font_size = 16
+        # Built lazily and reused until the property they depend on changes.
+        # QPen/QFont are value types, so items copy them on setPen/setFont.
+        self._pen = None
+        self._font = None
+
+    @property
+    def color(self) -> QColor:
+        return self._color
+
+    @color.setter
+    def color(self, value: QColor):
+        if value != self._color:
+            self._color = QColor(value)
+            self._pen = None
+
+    @property
+    def line_width(self) -> int:
+        return self._line_width
+
+    @line_width.setter
+    def line_width(self, value: int):
+        if value != self._line_width:
+            self._line_width = value
+            self._pen = None
+
+    @property
+    def font_size(self) -> int:
+        return self._font_size
+
+    @font_size.setter
+    def font_size(self, value: int):
+        if value != self._font_size:
+            self._font_size = value
+            self._font = None
 
     def get_pen(self) -> QPen:
-        return QPen(self.color, self.line_width, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin)
+        if self._pen is None:
+            self._pen = QPen(self._color, self._line_width, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin)
+        return self._pen
 
     def get_font(self) -> QFont:
-        # Use a common cross-platform font
-        return QFont("Arial", self.font_size)
+        if self._font is None:
+            # Use a common cross-platform font
+            self._font = QFont("Arial", self._font_size)
+        return self._font
 
 # --- Base Tool Class ---
 class Tool:
@@ -22,6 +63,8 @@ class Tool:
         self.properties = properties
         self.start_pos = QPointF()
         self.item = None
+        # Set by the view; used by tools that produce their undo command later than end()
+        self.on_command = None
 
     def start(self, scene, pos):
         self.start_pos = pos
@@ -30,20 +73,41 @@ class Tool:
         pass
 
     def end(self, scene):
-        if self.item:
-            # Ensure items are movable and selectable after creation
-            self.item.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
-            self.item.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
+        # Hand the item off so a reused tool never commits the same item twice
+        item, self.item = self.item, None
+        if item:
+            self._finalize_item(item)
             # Return the command for the Undo stack
-            return AddItemCommand(scene, self.item)
+            return AddItemCommand(scene, item)
         return None
 
+    @staticmethod
+    def _finalize_item(item):
+        # Ensure items are movable and selectable after creation (one flags change)
+        item.setFlags(
+            item.flags()
+            | QGraphicsItem.GraphicsItemFlag.ItemIsMovable
+            | QGraphicsItem.GraphicsItemFlag.ItemIsSelectable
+        )
+        # Cache the rasterized item so moves/redraws blit instead of re-stroking
+        # (ItemCoordinateCache rather than DeviceCoordinateCache, which clips effects)
+        item.setCacheMode(QGraphicsItem.CacheMode.ItemCoordinateCache)
+
 # --- Specific Tools ---
 
+class FastRectItem(QGraphicsRectItem):
+    """Axis-aligned rectangle: antialiasing only costs time here, so it is skipped."""
+    def paint(self, painter, option, widget=None):
+        # The view runs with DontSavePainterState, so restore the hint ourselves
+        antialiased = painter.testRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+        super().paint(painter, option, widget)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, antialiased)
+
 class RectangleTool(Tool):
     def start(self, scene, pos):
         super().start(scene, pos)
-        self.item = QGraphicsRectItem()
+        self.item = FastRectItem()
         self.item.setPen(self.properties.get_pen())
         scene.addItem(self.item)
 
@@ -76,10 +140,24 @@ class LineTool(Tool):
         if self.item:
             self.item.setLine(QLineF(self.start_pos, pos))
 
+class _EditableTextItem(QGraphicsTextItem):
+    """Text item that reports once when it loses keyboard focus."""
+    def __init__(self, text):
+        super().__init__(text)
+        self.on_focus_out = None
+
+    def focusOutEvent(self, event):
+        super().focusOutEvent(event)
+        callback, self.on_focus_out = self.on_focus_out, None
+        if callback:
+            callback()
+
 class TextTool(Tool):
+    PLACEHOLDER = "請輸入文字..."
+
     def start(self, scene, pos):
         super().start(scene, pos)
-        self.item = QGraphicsTextItem("請輸入文字...")
+        self.item = _EditableTextItem(self.PLACEHOLDER)
         self.item.setFont(self.properties.get_font())
         self.item.setDefaultTextColor(self.properties.color)
         self.item.setPos(pos)
@@ -87,46 +165,118 @@ class TextTool(Tool):
         self.item.setTextInteractionFlags(Qt.TextInteractionFlag.TextEditorInteraction)
         scene.addItem(self.item)
         self.item.setFocus()
+        # Select the placeholder so the first keystroke replaces it
+        cursor = self.item.textCursor()
+        cursor.select(QTextCursor.SelectionType.Document)
+        self.item.setTextCursor(cursor)
 
     def end(self, scene):
-        # Text tool finishes immediately upon creation
-        if self.item:
-             # If text is empty or default, remove it
-             if self.item.toPlainText() == "" or self.item.toPlainText() == "請輸入文字...":
-                 scene.removeItem(self.item)
-                 return None
-             return super().end(scene)
+        # The view finishes text placement right after start(), before the user
+        # has typed. Commit the item on its first real edit instead; if focus
+        # leaves while it still holds the placeholder, drop it.
+        item, self.item = self.item, None
+        if item is None:
+            return None
+        state = {"committed": False}
+
+        def has_text():
+            text = item.toPlainText()
+            return text != "" and text != self.PLACEHOLDER
+
+        def on_edit():
+            if state["committed"] or not has_text():
+                return
+            state["committed"] = True
+            self._finalize_item(item)
+            if self.on_command:
+                self.on_command(AddItemCommand(scene, item))
+
+        def on_focus_out():
+            if not state["committed"] and item.scene() is scene:
+                scene.removeItem(item)
+
+        item.document().contentsChanged.connect(on_edit)
+        item.on_focus_out = on_focus_out
         return None
 
 # --- Undo/Redo Commands ---
 
+@contextmanager
+def _batched_scene_changes(scene):
+    """
+    Groups many addItem/removeItem calls: no index maintenance and no change
+    signals per item, then a single scene update at the end.
+    """
+    index_method = scene.itemIndexMethod()
+    if index_method != QGraphicsScene.ItemIndexMethod.NoIndex:
+        scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+    was_blocked = scene.blockSignals(True)
+    try:
+        yield
+    finally:
+        scene.blockSignals(was_blocked)
+        if index_method != QGraphicsScene.ItemIndexMethod.NoIndex:
+            scene.setItemIndexMethod(index_method)
+        scene.update()
+
 class AddItemCommand(QUndoCommand):
+    # Shapes of the same kind drawn in quick succession fold into one command,
+    # so a burst of strokes is undone/redone (and repainted) in a single step.
+    MERGE_ID = 1
+    MERGE_WINDOW_S = 0.5
+
     def __init__(self, scene, item):
         super().__init__(f"Add {type(item).__name__}")
         self.scene = scene
-        self.item = item
+        self.items = [item]
         self.initial_add = True
+        self._ts = time.monotonic()
+
+    def id(self):
+        return self.MERGE_ID
+
+    def mergeWith(self, other):
+        if not isinstance(other, AddItemCommand):
+            return False
+        if type(other.items[0]) is not type(self.items[0]):
+            return False
+        if other._ts - self._ts > self.MERGE_WINDOW_S:
+            return False
+        self.items.extend(other.items)
+        # Measure the window from the latest stroke so a steady burst keeps merging
+        self._ts = other._ts
+        self.setText(f"Add {len(self.items)} {type(self.items[0]).__name__}")
+        return True
 
     def undo(self):
-        self.scene.removeItem(self.item)
+        with _batched_scene_changes(self.scene):
+            for item in self.items:
+                self.scene.removeItem(item)
 
     def redo(self):
         # The first redo() call is actually the initial action.
-        # Subsequent redo() calls restore the item if undone.
+        # Subsequent redo() calls restore the items if undone.
         if not self.initial_add:
-             self.scene.addItem(self.item)
+            with _batched_scene_changes(self.scene):
+                for item in self.items:
+                    self.scene.addItem(item)
         self.initial_add = False
 
 class DeleteItemsCommand(QUndoCommand):
     def __init__(self, scene, items):
         super().__init__(f"Delete {len(items)} Item(s)")
         self.scene = scene
-        self.items = items # List of items
+        # Keep the item objects themselves rather than rebuilding them from a snapshot:
+        # earlier AddItemCommands on the stack refer to these same instances, so undo
+        # must restore the identical objects for their undo()/redo() to stay valid.
+        self.items = tuple(items)
 
     def undo(self):
-        for item in self.items:
-            self.scene.addItem(item)
+        with _batched_scene_changes(self.scene):
+            for item in self.items:
+                self.scene.addItem(item)
 
     def redo(self):
-        for item in self.items:
-            self.scene.removeItem(item)
\ No newline at end of file
+        with _batched_scene_changes(self.scene):
+            for item in self.items:
+                self.scene.removeItem(item)
\ No newline at end of file
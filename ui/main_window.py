@@ -6,30 +6,45 @@ import os
 import logging
 import asyncio
 import re
+from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import numpy as np
-from PySide6.QtCore import Qt, QTimer, QSize, QItemSelectionModel, QRect, QPoint
+from PySide6.QtCore import Qt, QTimer, QElapsedTimer, QSize, QItemSelectionModel, QRect, QPoint, QEvent
 from PySide6.QtGui import QKeySequence, QImage, QPixmap, QAction
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QSplitter, QListView,
-    QTextEdit, QPushButton, QToolBar, QStatusBar, QApplication, QLabel,
+    QTextEdit, QPushButton, QToolBar, QStatusBar, QLabel,
     QMenu, QMessageBox, QScrollArea, QLineEdit, QFormLayout
 )
 
 from core.config import settings_manager
 from core.hotkeys import HotkeyManager
-from core.screenshot import capture_active_window, capture_region
-from core.imaging import ImageSaveOptions, save_image_async
+from core.screenshot import capture_active_window, capture_region, foreground_window_handle
+from core.imaging import ImageSaveOptions, save_image
 from core.ai_client.manager import ai_manager
 from core.models import AnalysisResult
 
 from ui.queue_model import UploadQueueModel, THUMBNAIL_SIZE
-from ui.settings_dialog import SettingsDialog
 from ui.widgets import SnippingTool, AnalysisCard
 
+if TYPE_CHECKING:
+    import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# 結果區保留的分析卡片數上限
+MAX_RESULT_CARDS = 50
+# 最小化後至少等待的時間（系統最小化動畫與前景切換），以及等待的上限
+MINIMIZE_SETTLE_MS = 120
+MINIMIZE_MAX_WAIT_MS = 300
+
+# 從檔名猜股票代號（獨立的 4 位數字）與名稱（連續英文字母或中文字）
+# 代號只認 ASCII 數字（re.ASCII：\d 不查 Unicode 數字表）；名稱以本工具常見的中文優先嘗試，
+# 兩個字元類互斥，順序不影響結果
+_RE_SYMBOL = re.compile(r'(?<!\d)(\d{4})(?!\d)', re.ASCII)
+_RE_NAME = re.compile(r'([\u4e00-\u9fa5]{2,}|[A-Za-z]{2,})')
+
 class _OverlaySnip(QWidget):
     def __init__(self, on_done):
         super().__init__(flags=Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
@@ -72,8 +87,46 @@ class MainWindow(QMainWindow):
         self.hotkey_manager = HotkeyManager(self)
         self.queue_model = UploadQueueModel(self)
         self.snipping_tool = SnippingTool()
+        # 截圖工具的啟動方法只在這裡解析一次（F4 熱路徑不再逐一探測屬性）
+        self._snip_start = next(
+            (getattr(self.snipping_tool, n) for n in ("start", "begin", "activate", "show")
+             if callable(getattr(self.snipping_tool, n, None))),
+            None,
+        )
         self.editor_window = None
         self._saved_state = None
+        # 截圖流程進行中（最小化等待～截取完成），期間重複的熱鍵直接忽略
+        self._capture_in_progress = False
+        # 等待視窗最小化後才執行的截圖動作：每個畫面檢查一次前景視窗，
+        # 至少等 MINIMIZE_SETTLE_MS、最多等 MINIMIZE_MAX_WAIT_MS
+        self._pending_capture = None
+        self._capture_clock = QElapsedTimer()
+        self._capture_poll_timer = QTimer(self)
+        self._capture_poll_timer.setInterval(16)
+        self._capture_poll_timer.timeout.connect(self._poll_pending_capture)
+        # 等待視窗還原後才截取的框選範圍
+        self._pending_region: dict | None = None
+        # 進行中的背景存檔數；>0 時視為連拍，改走 process pool
+        self._saves_in_flight = 0
+        # 進行中的背景 Task（分析、存檔；強參照）
+        self._tasks: set[asyncio.Task] = set()
+        # 目前的分析請求；送出新請求或關閉視窗時取消
+        self._analysis_task: asyncio.Task | None = None
+        # 截圖存檔目錄與品質快取（設定變更時清除），存檔熱路徑不必每次讀 QSettings
+        self._capture_dir: str | None = None
+        self._capture_quality: int | None = None
+        # 剛存好、等待批次加入佇列的檔案
+        self._pending_saved: list[tuple[str, QImage | None]] = []
+        self._saved_flush_timer = QTimer(self)
+        self._saved_flush_timer.setSingleShot(True)
+        self._saved_flush_timer.setInterval(50)
+        self._saved_flush_timer.timeout.connect(self._flush_saved_paths)
+        # 狀態訊息節流：50ms 內只顯示最後一則，info 記錄合併成一筆
+        self._status_pending: list[str] = []
+        self._status_timer = QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.setInterval(50)
+        self._status_timer.timeout.connect(self._flush_status)
 
         self._build_ui()
         self._connect()
@@ -97,6 +150,10 @@ class MainWindow(QMainWindow):
         self.queue_view.setGridSize(QSize(THUMBNAIL_SIZE + 20, THUMBNAIL_SIZE + 30))
         self.queue_view.setResizeMode(QListView.Adjust)
         self.queue_view.setSpacing(6)
+        # 每格大小相同（固定 grid）：版面計算不必逐項量測；大量項目分批排版
+        self.queue_view.setUniformItemSizes(True)
+        self.queue_view.setLayoutMode(QListView.Batched)
+        self.queue_view.setBatchSize(64)
         self.queue_view.setDragEnabled(True)
         self.queue_view.setAcceptDrops(True)
         self.queue_view.setDropIndicatorShown(True)
@@ -104,6 +161,10 @@ class MainWindow(QMainWindow):
         self.queue_view.setSelectionMode(QListView.ExtendedSelection)
         self.queue_view.setContextMenuPolicy(Qt.CustomContextMenu)
         self.queue_view.customContextMenuRequested.connect(self._queue_menu)
+        # 右鍵選單只建立一次，每次開啟時不再重建 QMenu/QAction
+        self._queue_context_menu = QMenu(self)
+        act_del = QAction("刪除選取", self); act_del.triggered.connect(self._remove_selected_queue_items)
+        self._queue_context_menu.addAction(act_del)
         ql.addWidget(self.queue_view)
         splitter.addWidget(qpanel)
 
@@ -137,25 +198,32 @@ class MainWindow(QMainWindow):
 
         # 工具列
         tb = QToolBar("Main"); self.addToolBar(tb)
-        act_f2 = QAction("截當前視窗", self); act_f2.triggered.connect(lambda: self._trigger_screenshot("window")); tb.addAction(act_f2)
-        act_f3 = QAction("截並編輯", self); act_f3.triggered.connect(lambda: self._trigger_screenshot("edit")); tb.addAction(act_f3)
-        act_f4 = QAction("框選截圖", self); act_f4.triggered.connect(lambda: self._trigger_screenshot("region")); tb.addAction(act_f4)
+        act_f2 = QAction("截當前視窗", self); act_f2.triggered.connect(self._trigger_window); tb.addAction(act_f2)
+        act_f3 = QAction("截並編輯", self); act_f3.triggered.connect(self._trigger_edit); tb.addAction(act_f3)
+        act_f4 = QAction("框選截圖", self); act_f4.triggered.connect(self._trigger_region); tb.addAction(act_f4)
         tb.addSeparator()
         act_clear = QAction("清空待上傳", self); act_clear.triggered.connect(self.queue_model.clear_queue); tb.addAction(act_clear)
         act_settings = QAction("設定", self); act_settings.triggered.connect(self.open_settings); tb.addAction(act_settings)
 
         # 快捷鍵備援
-        for key, cb in (("F3", lambda: self._trigger_screenshot("edit")),
-                        ("F4", lambda: self._trigger_screenshot("region"))):
+        for key, cb in (("F3", self._trigger_edit), ("F4", self._trigger_region)):
             qs = QAction(self); qs.setShortcut(QKeySequence(key)); qs.triggered.connect(cb); self.addAction(qs)
 
         self.statusBar = QStatusBar(); self.setStatusBar(self.statusBar)
+        # 非模態的錯誤提示（分析失敗時顯示，不阻擋下一次請求）
+        self.error_ticker = QLabel(); self.error_ticker.setObjectName("ErrorTicker")
+        self.error_ticker.setStyleSheet("color: #e05252; padding: 0 6px;")
+        self.error_ticker.hide()
+        self.statusBar.addPermanentWidget(self.error_ticker)
+        self._error_ticker_timer = QTimer(self); self._error_ticker_timer.setSingleShot(True)
+        self._error_ticker_timer.setInterval(15000)
+        self._error_ticker_timer.timeout.connect(self.error_ticker.hide)
 
     def _connect(self):
         try:
-            self.hotkey_manager.trigger_f2.connect(lambda: self._trigger_screenshot("window"))
-            self.hotkey_manager.trigger_f3.connect(lambda: self._trigger_screenshot("edit"))
-            self.hotkey_manager.trigger_f4.connect(lambda: self._trigger_screenshot("region"))
+            self.hotkey_manager.trigger_f2.connect(self._trigger_window)
+            self.hotkey_manager.trigger_f3.connect(self._trigger_edit)
+            self.hotkey_manager.trigger_f4.connect(self._trigger_region)
             self.hotkey_manager.start(["<f3>", "<f4>"])
         except Exception as e:
             logger.warning("全域熱鍵初始化失敗，將僅使用視窗內快捷鍵：%s", e)
@@ -168,20 +236,51 @@ class MainWindow(QMainWindow):
         settings_manager.settings_changed.connect(self.on_settings_changed)
 
     # ---------- 截圖 ----------
+    # 熱鍵／工具列直接連到綁定方法，不必每個連線各自包一層 lambda
+    def _trigger_window(self):
+        self._trigger_screenshot("window")
+
+    def _trigger_edit(self):
+        self._trigger_screenshot("edit")
+
+    def _trigger_region(self):
+        self._trigger_screenshot("region")
+
     def _trigger_screenshot(self, mode: str):
+        if self._capture_in_progress:
+            return
+        self._capture_in_progress = True
+        if mode == "region":
+            fn = self._start_snipping_tool
+        else:
+            fn = partial(self._do_capture, mode)
+
         if sys.platform == "win32":
             self._saved_state = self.windowState()
+            # 不用 processEvents()（會遞迴派送其他事件，連按熱鍵時可能重複截圖）。
+            # setWindowState 會同步送出 WindowStateChange，此時系統的最小化動畫與
+            # 前景切換都還沒完成，因此改為輪詢：前景不再是本視窗時才截圖
+            self._pending_capture = fn
+            self._capture_clock.start()
+            self._capture_poll_timer.start()
             self.setWindowState(Qt.WindowMinimized)
-            QApplication.processEvents()
-            delay = 300
         else:
             self._saved_state = None
-            delay = 120
+            QTimer.singleShot(120, fn)
 
-        if mode == "region":
-            QTimer.singleShot(delay, self._start_snipping_tool)
-        else:
-            QTimer.singleShot(delay, lambda: self._do_capture(mode))
+    def _poll_pending_capture(self):
+        elapsed = self._capture_clock.elapsed()
+        if elapsed < MINIMIZE_SETTLE_MS:
+            return
+        if elapsed < MINIMIZE_MAX_WAIT_MS and foreground_window_handle() == int(self.winId()):
+            return
+        self._run_pending_capture()
+
+    def _run_pending_capture(self):
+        self._capture_poll_timer.stop()
+        fn, self._pending_capture = self._pending_capture, None
+        if fn is not None:
+            fn()
 
     def _restore_window(self):
         if self._saved_state is not None:
@@ -192,11 +291,11 @@ class MainWindow(QMainWindow):
             self.showNormal(); self.activateWindow()
 
     def _start_snipping_tool(self):
-        st = self.snipping_tool
-        for name in ("start", "begin", "activate", "show"):
-            if hasattr(st, name) and callable(getattr(st, name)):
-                getattr(st, name)()
-                return
+        # 框選畫面出現後交由使用者操作（取消時不會回呼），此時即可解除鎖定
+        self._capture_in_progress = False
+        if self._snip_start:
+            self._snip_start()
+            return
         def _done(region_dict):
             self._finish_region_capture(region_dict)
         ov = _OverlaySnip(_done)
@@ -215,12 +314,30 @@ class MainWindow(QMainWindow):
         except Exception as e:
             logger.exception("截圖失敗：%s", e)
             QMessageBox.critical(self, "截圖失敗", str(e))
+        finally:
+            self._capture_in_progress = False
 
     def _handle_region_capture(self, monitor_dict: dict):
+        # 視窗還原完成（changeEvent）後只再等一個畫面更新，讓合成器移除框選遮罩；
+        # 視窗狀態沒有變化時（例如未最小化），由 50ms 的保底計時器觸發
+        self._pending_region = monitor_dict
         self._restore_window()
-        QTimer.singleShot(50, lambda: self._finish_region_capture(monitor_dict))
+        QTimer.singleShot(50, self._flush_pending_region)
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            if self._pending_region is not None:
+                QTimer.singleShot(16, self._flush_pending_region)
+
+    def _flush_pending_region(self):
+        monitor_dict, self._pending_region = self._pending_region, None
+        if monitor_dict is not None:
+            self._finish_region_capture(monitor_dict)
 
     def _finish_region_capture(self, monitor_dict: dict):
+        # 每次截圖都是 mss 新配置的像素（零複製包住），之後沒有人會再改寫，
+        # 單張轉 QImage 與連拍送 process pool 都不必另外複製
         img = capture_region(monitor_dict)
         if img is None or (isinstance(img, QPixmap) and img.isNull()):
             self._status("錯誤：無法截取指定範圍。", True)
@@ -228,64 +345,142 @@ class MainWindow(QMainWindow):
         self._process_and_save(img)
 
     # ---------- 儲存與加入佇列 ----------
-    def _nd_to_qimage(self, arr: np.ndarray) -> QImage:
+    def _nd_to_qimage(self, arr: np.ndarray, copy: bool = True) -> QImage:
+        """
+        ndarray → QImage。copy=False 時直接包住 ndarray 的記憶體（零複製），
+        並把 ndarray 掛在 QImage 上保持存活；呼叫端須保證之後不再改寫該陣列。
+        """
+        # 延後載入 NumPy（約 100ms），主視窗可先顯示
+        import numpy as np
         if arr.dtype != np.uint8:
-            arr = np.clip(arr, 0, 255).astype(np.uint8)
-        h, w = arr.shape[:2]
-        if arr.ndim == 3 and arr.shape[2] == 3:
-            return QImage(arr.data, w, h, 3*w, QImage.Format_RGB888).copy()
-        if arr.ndim == 3 and arr.shape[2] == 4:
-            return QImage(arr.data, w, h, 4*w, QImage.Format_RGBA8888).copy()
-        raise ValueError(f"Unsupported ndarray shape: {arr.shape}")
+            # clip 與轉型合併成一次掃描，直接寫入新的 uint8 陣列
+            arr = np.clip(arr, 0, 255, out=np.empty(arr.shape, dtype=np.uint8), casting="unsafe")
+            copy = False
+        buf = np.ascontiguousarray(arr)
+        if buf is not arr:
+            copy = False  # 已是新配置的連續陣列，無須再複製
+        h, w = buf.shape[:2]
+        if buf.ndim == 3 and buf.shape[2] == 3:
+            fmt = QImage.Format_RGB888
+        elif buf.ndim == 3 and buf.shape[2] == 4:
+            # 截圖為 BGRA；little-endian 下即 ARGB32 的記憶體排列。
+            # 不透明時標成 RGB32：同一塊記憶體、無需轉換，編碼器也不必處理 alpha 平面
+            if np.all(buf[::64, ::64, 3] == 255):
+                fmt = QImage.Format_RGB32
+            else:
+                fmt = QImage.Format_ARGB32
+        else:
+            raise ValueError(f"Unsupported ndarray shape: {arr.shape}")
+        qimg = QImage(buf.data, w, h, buf.strides[0], fmt)
+        if copy:
+            return qimg.copy()
+        qimg._buf = buf  # QImage 不擁有這塊記憶體
+        return qimg
 
     def _process_and_save(self, image_input):
         try:
             img_obj = image_input
-            if isinstance(image_input, np.ndarray):
-                img_obj = self._nd_to_qimage(image_input)
-
-            base_dir = settings_manager.get("Capture/Directory") or str(Path.home() / "Pictures" / "FastDaytradeAssistant")
-            opts = ImageSaveOptions(base_dir=base_dir, preferred_ext="webp", use_date_subdir=True, prefix="")
-
-            def on_started(): self._status("正在背景處理並儲存影像...")
-            def on_done(path: str, ms: float):
-                logger.info("Image saved in %.2f ms: %s", ms, path)
-                self._on_image_saved(path)
-            def on_error(msg: str):
-                logger.error("存檔失敗: %s", msg)
-                QMessageBox.critical(self, "存檔失敗", msg)
-
-            save_image_async(img_obj, opts, on_started=on_started, on_done=on_done, on_error=on_error)
+            # QImage/QPixmap（編輯器輸出）直接存檔；ndarray 才需要轉換。
+            # 連拍時直接把 ndarray 交給 process pool 編碼；單張仍轉 QImage 走執行緒
+            # 以模組名判斷 ndarray，只處理 QImage/QPixmap 時不必載入 NumPy
+            if isinstance(image_input, (QImage, QPixmap)):
+                pass
+            elif type(image_input).__module__ == "numpy":
+                # 截圖的 ndarray 每次都是新配置的，直接交出去（零複製）
+                if self._saves_in_flight == 0:
+                    img_obj = self._nd_to_qimage(image_input, copy=False)
+
+            base_dir = self._capture_dir or self._refresh_capture_dir()
+            opts = ImageSaveOptions(
+                base_dir=base_dir, preferred_ext="webp", use_date_subdir=True, prefix="",
+                quality=self._capture_quality if self._capture_quality is not None else self._refresh_capture_quality(),
+                thumbnail_size=THUMBNAIL_SIZE,
+            )
+            # 計數要在排程前同步增加，下一張連拍才看得到
+            self._saves_in_flight += 1
+            self._spawn(self._save_image(img_obj, opts))
         except Exception as e:
             logger.exception("process/save 例外：%s", e)
             QMessageBox.critical(self, "錯誤", str(e))
 
-    def _on_image_saved(self, path: str):
-        self.queue_model.add_item(path)
+    async def _save_image(self, img_obj, opts: ImageSaveOptions):
+        try:
+            path, ms, thumb = await save_image(
+                img_obj, opts, on_started=self._on_save_started, copy=False)
+        except Exception as e:
+            logger.error("存檔失敗: %s", e)
+            QMessageBox.critical(self, "存檔失敗", str(e))
+            return
+        finally:
+            self._saves_in_flight -= 1
+        logger.info("Image saved in %.2f ms: %s", ms, path)
+        self._on_image_saved(path, thumb)
+
+    def _on_save_started(self):
+        self._status("正在背景處理並儲存影像...")
+
+    def _spawn(self, coro) -> asyncio.Task:
+        # 迴圈只弱參照 Task，需自行保留到完成，避免執行中被 GC
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _refresh_capture_dir(self) -> str:
+        self._capture_dir = settings_manager.get("Capture/Directory") or str(Path.home() / "Pictures" / "FastDaytradeAssistant")
+        return self._capture_dir
+
+    def _refresh_capture_quality(self) -> int:
+        self._capture_quality = settings_manager.get_int("Image/Quality", 85)
+        return self._capture_quality
+
+    def _on_image_saved(self, path: str, thumb: QImage | None = None):
+        # 連拍時存檔完成會接連抵達：先累積，50ms 內的一批一次加入佇列
+        # thumb：存檔 worker 已由記憶體中的影像產生的縮圖，免得再從檔案讀回解碼
+        self._pending_saved.append((path, thumb))
+        if not self._saved_flush_timer.isActive():
+            self._saved_flush_timer.start()
+
+    def _flush_saved_paths(self):
+        pending, self._pending_saved = self._pending_saved, []
+        if not pending:
+            return
+        paths = [p for p, _ in pending]
+        self.queue_model.add_items(paths, [t for _, t in pending])
+        path = paths[-1]
+        # 暫停重繪，並以單一 setCurrentIndex(ClearAndSelect)
+        # 取代 clear/setCurrent/select 三次各自發出訊號與重繪
+        self.queue_view.setUpdatesEnabled(False)
         try:
             sel = self.queue_view.selectionModel()
             if sel:
-                sel.clearSelection()
                 idx = self.queue_model.index(0, 0)
-                self.queue_view.setCurrentIndex(idx)
-                sel.select(idx, QItemSelectionModel.Select | QItemSelectionModel.Rows)
+                sel.setCurrentIndex(idx, QItemSelectionModel.ClearAndSelect | QItemSelectionModel.Rows)
                 self.queue_view.scrollTo(idx)
         except Exception:
             pass
+        finally:
+            self.queue_view.setUpdatesEnabled(True)
         self._status(f"已加入待上傳區: {os.path.basename(path)}")
         # 嘗試從檔名自動帶出代號/名稱（若尚未填）
         if not self.ed_symbol.text().strip() or not self.ed_name.text().strip():
-            self._auto_fill_symbol_name([path])
+            self._auto_fill_symbol_name(paths)
 
     # ---------- 編輯器 ----------
     def _open_editor(self, image):
-        from ui.editor.editor_window import ImageEditorWindow
-        if hasattr(self, "editor_window") and self.editor_window and self.editor_window.isVisible():
-            if not self.editor_window.close():
+        # 編輯器只建立一次，之後重複使用（關閉時只是隱藏），信號也只連一次
+        if self.editor_window is None:
+            from ui.editor.editor_window import ImageEditorWindow
+            self.editor_window = ImageEditorWindow(image, self)
+            self.editor_window.image_saved.connect(self._process_and_save)
+        else:
+            # 仍開著的編輯器若有未儲存變更，會先詢問；使用者取消則保留原內容
+            if self.editor_window.isVisible() and not self.editor_window.close():
                 return
-        self.editor_window = ImageEditorWindow(image, self)
-        self.editor_window.image_saved.connect(lambda qimg: self._process_and_save(qimg))
+            self.editor_window.load_image(image)
         self.editor_window.show()
+        self.editor_window.raise_()
+        self.editor_window.activateWindow()
 
     # ---------- 分析 ----------
     def send_analysis_request(self):
@@ -328,28 +523,65 @@ class MainWindow(QMainWindow):
         self.set_loading_state(True)
         prov = settings_manager.get("AI/Provider") or "OpenAI"
         self._status(f"開始分析請求 (使用 {prov})...")
-        asyncio.create_task(self._run_analysis(image_paths, payload_text))
+        # 新請求取代尚未完成的舊請求，不再等待（與付費）已被放棄的呼叫
+        self._cancel_analysis()
+        self._analysis_task = self._spawn(self._run_analysis(image_paths, payload_text))
+
+    def _cancel_analysis(self):
+        task, self._analysis_task = self._analysis_task, None
+        if task is not None and not task.done():
+            task.cancel()
 
     async def _run_analysis(self, image_paths: list[str], user_text: str):
         try:
             result: AnalysisResult = await ai_manager.analyze(image_paths, user_text)
             self._status(f"分析完成。耗時: {result.response_time:.2f}s")
-            card = AnalysisCard(result)
-            self.results_layout.insertWidget(0, card)
+            self._prepend_result_card(result)
             if settings_manager.get("General/AutoClearQueue"):
                 sel = self.queue_view.selectionModel()
                 idxs = sel.selectedIndexes() if sel else []
                 self.queue_model.remove_items(idxs)
                 self.user_input.clear()
         except Exception as e:
+            # 不彈出模態對話框：錯誤留在狀態列，使用者可立即送出下一個請求
             self._status(f"分析失敗: {e}", True)
-            QMessageBox.critical(self, "分析錯誤", f"請求 AI 分析時發生錯誤：\n\n{e}")
+            self._show_error_ticker(f"分析錯誤：{e}")
+        finally:
+            # 被新請求取代而取消時，載入狀態已屬於新的請求，不在此解除
+            if asyncio.current_task() is self._analysis_task:
+                self._analysis_task = None
+                self.set_loading_state(False)
+
+    def _prepend_result_card(self, result: AnalysisResult):
+        # 新卡片插在最上方；超過上限的舊卡片移除，讓每次插入的重排成本固定，
+        # 不會隨著一整天的分析次數線性變慢。已達上限時直接重用最舊的卡片（只更新文字），
+        # 省去建立元件與套用樣式的成本
+        layout = self.results_layout
+        oldest = None
+        if layout.count() >= MAX_RESULT_CARDS:
+            item = layout.itemAt(layout.count() - 1)
+            oldest = item.widget() if item else None
+        self.results_container.setUpdatesEnabled(False)
+        try:
+            if isinstance(oldest, AnalysisCard):
+                layout.removeWidget(oldest)
+                oldest.update_result(result)
+                card = oldest
+            else:
+                card = AnalysisCard(result)
+            layout.insertWidget(0, card)
+            while layout.count() > MAX_RESULT_CARDS:
+                item = layout.takeAt(layout.count() - 1)
+                old = item.widget() if item else None
+                if old:
+                    old.deleteLater()
         finally:
-            self.set_loading_state(False)
+            self.results_container.setUpdatesEnabled(True)
 
     # ---------- 設定視窗 ----------
     def open_settings(self):
         try:
+            from ui.settings_dialog import SettingsDialog
             dlg = SettingsDialog(self)
             dlg.exec()
         except Exception as e:
@@ -357,15 +589,20 @@ class MainWindow(QMainWindow):
 
     # ---------- 雜項 ----------
     def _queue_menu(self, pos):
-        indexes = self.queue_view.selectedIndexes()
-        menu = QMenu(self)
-        if indexes:
-            act_del = QAction("刪除選取", self); act_del.triggered.connect(lambda: self.queue_model.remove_items(list(indexes))); menu.addAction(act_del)
-        if menu.actions():
-            menu.exec(self.queue_view.viewport().mapToGlobal(pos))
+        if self.queue_view.selectionModel().hasSelection():
+            self._queue_context_menu.exec(self.queue_view.viewport().mapToGlobal(pos))
+
+    def _remove_selected_queue_items(self):
+        self.queue_model.remove_items(self.queue_view.selectedIndexes())
 
     def on_settings_changed(self):
-        self._update_send_ready()
+        if settings_manager.touched("Capture/Directory"):
+            self._capture_dir = None
+        if settings_manager.touched("Image/Quality"):
+            self._capture_quality = None
+        # 檢查 API Key 需讀 keyring，只在供應商或金鑰變更時重做
+        if settings_manager.touched("AI/Provider", "OpenAI/APIKey", "Gemini/APIKey"):
+            self._update_send_ready()
 
     def _update_send_ready(self) -> bool:
         prov = settings_manager.get("AI/Provider") or "OpenAI"
@@ -382,15 +619,39 @@ class MainWindow(QMainWindow):
         self.send_button.setEnabled(not loading)
         self.send_button.setText("分析中..." if loading else "送出分析請求")
 
+    def _show_error_ticker(self, msg: str):
+        first_line = msg.splitlines()[0] if msg else ""
+        self.error_ticker.setText(first_line[:120])
+        self.error_ticker.setToolTip(msg)
+        self.error_ticker.show()
+        self._error_ticker_timer.start()
+
     def _status(self, msg: str, err: bool = False):
-        self.statusBar.showMessage(msg, 5000)
-        (logger.error if err else logger.info)(msg)
+        if err:
+            # 錯誤不節流：先送出排隊中的訊息維持順序，再立即顯示並記錄
+            self._flush_status()
+            self.statusBar.showMessage(msg, 5000)
+            logger.error(msg)
+            return
+        self._status_pending.append(msg)
+        if not self._status_timer.isActive():
+            self._status_timer.start()
+
+    def _flush_status(self):
+        self._status_timer.stop()
+        if not self._status_pending:
+            return
+        msgs, self._status_pending = self._status_pending, []
+        self.statusBar.showMessage(msgs[-1], 5000)
+        logger.info("\n".join(msgs))
 
     def closeEvent(self, e):
         try:
             self.hotkey_manager.stop()
         except Exception:
             pass
+        # 事件圈仍在執行中，無法同步等待；取消後由 qasync 在結束前處理
+        self._cancel_analysis()
         super().closeEvent(e)
 
     # ---------- 代號/名稱猜測 ----------
@@ -405,16 +666,19 @@ class MainWindow(QMainWindow):
         sym = None
         name = None
         for p in paths:
-            fname = os.path.basename(p)
-            base, _ = os.path.splitext(fname)
-            m = re.search(r'(?<!\d)(\d{4})(?!\d)', base)
-            if m and not sym:
-                sym = m.group(1)
-            tmp = re.sub(r'[\d_@()\-\[\]{}]+', ' ', base)
-            tmp = re.sub(r'\s+', ' ', tmp).strip()
-            m2 = re.search(r'([A-Za-z]{2,}|[\u4e00-\u9fa5]{2,})', tmp)
-            if m2 and not name:
-                name = m2.group(1)
+            # 直接切字串取主檔名（不建 Path 物件）；Windows 路徑兩種分隔符都可能出現
+            fname = p[max(p.rfind("/"), p.rfind("\\")) + 1:]
+            dot = fname.rfind(".")
+            base = fname[:dot] if dot > 0 else fname
+            if not sym:
+                m = _RE_SYMBOL.search(base)
+                if m:
+                    sym = m.group(1)
+            if not name:
+                # 非英文字母/中文字的字元本來就會切斷比對，不必先把數字與符號替換成空白
+                m2 = _RE_NAME.search(base)
+                if m2:
+                    name = m2.group(1)
             if sym and name:
                 break
         return sym, name
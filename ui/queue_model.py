@@ -1,35 +1,157 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import itertools
 import os
-from PySide6.QtCore import QAbstractListModel, Qt, QModelIndex, QSize
-from PySide6.QtGui import QImageReader, QPixmap, QIcon
+import time
+from pathlib import Path
+from PySide6.QtCore import QAbstractListModel, Qt, QModelIndex, QSize, QObject, QRunnable, QStandardPaths, QThreadPool, Signal, Slot
+from PySide6.QtGui import QImage, QImageReader, QPixmap, QPixmapCache, QIcon
 
 THUMBNAIL_SIZE = 100
+THUMBNAIL_CACHE_KB = 20 * 1024
+# On-disk thumbnail cache limits, enforced once per run when the cache dir is first used
+THUMBNAIL_DISK_CACHE_MAX_AGE_DAYS = 14
+THUMBNAIL_DISK_CACHE_MAX_MB = 64
+
+def _decode_thumbnail(path: str) -> QImage | None:
+    """Decodes a scaled-down image; QImageReader/QImage are safe to use off the GUI thread."""
+    try:
+        # QImageReader can read metadata and scale during decoding, which is faster
+        reader = QImageReader(path)
+        # Quality 0 lets plugins that scale after decoding (PNG) use fast scaling;
+        # a 100px thumbnail does not need smooth filtering
+        reader.setQuality(0)
+        reader.setAutoTransform(True)
+        if reader.canRead():
+            original_size = reader.size()
+            if original_size.isValid():
+                scaled_size = original_size.scaled(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE), Qt.AspectRatioMode.KeepAspectRatio)
+                reader.setScaledSize(scaled_size)
+
+            image = reader.read()
+            if not image.isNull():
+                return image
+    except Exception as e:
+        print(f"Error creating thumbnail for {path}: {e}")
+    return None
+
+@functools.lru_cache(maxsize=1)
+def _thumb_cache_dir() -> Path | None:
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+    cache_dir = (Path(base) if base else Path.home() / ".cache" / "FastDaytradeAssistant") / "thumbs"
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    _prune_thumb_cache(cache_dir)
+    return cache_dir
+
+def _prune_thumb_cache(cache_dir: Path):
+    """
+    Entries are keyed by path + mtime, so deleted, renamed or re-saved captures leave
+    orphans behind. Drop entries unused for THUMBNAIL_DISK_CACHE_MAX_AGE_DAYS, then the
+    least recently used ones until the cache fits in THUMBNAIL_DISK_CACHE_MAX_MB.
+    """
+    cutoff = time.time() - THUMBNAIL_DISK_CACHE_MAX_AGE_DAYS * 86400
+    entries = []
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".png"):
+                    continue
+                try:
+                    st = entry.stat()
+                    if st.st_mtime < cutoff:
+                        os.remove(entry.path)
+                    else:
+                        entries.append((st.st_mtime, st.st_size, entry.path))
+                except OSError:
+                    pass
+    except OSError:
+        return
+    total = sum(size for _, size, _ in entries)
+    budget = THUMBNAIL_DISK_CACHE_MAX_MB * 1024 * 1024
+    if total <= budget:
+        return
+    entries.sort()
+    for _, size, path in entries:
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        if total <= budget:
+            break
+
+@functools.lru_cache(maxsize=256)
+def _load_thumbnail(abspath: str, mtime_ns: int, size: int) -> QImage | None:
+    """
+    Thumbnail for one version of a file: in-process LRU first, then the on-disk
+    cache, then a real decode (which is written back to the disk cache).
+    """
+    cache_dir = _thumb_cache_dir()
+    cache_path = None
+    if cache_dir is not None:
+        key = hashlib.sha1(f"{abspath}|{mtime_ns}|{size}".encode("utf-8")).hexdigest()
+        cache_path = cache_dir / f"{key}.png"
+        if cache_path.exists():
+            cached = QImage(str(cache_path))
+            if not cached.isNull():
+                # Refresh the mtime so pruning treats the entry as recently used
+                try:
+                    os.utime(cache_path)
+                except OSError:
+                    pass
+                return cached
+    image = _decode_thumbnail(abspath)
+    if image is not None and cache_path is not None:
+        image.save(str(cache_path), "PNG")
+    return image
+
+def _read_thumbnail(path: str) -> QImage | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return _load_thumbnail(os.path.abspath(path), st.st_mtime_ns, THUMBNAIL_SIZE)
+
+def _placeholder_pixmap() -> QPixmap:
+    pixmap = QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+    pixmap.fill(Qt.GlobalColor.lightGray)
+    return pixmap
+
+class _ThumbnailSignals(QObject):
+    finished = Signal(int, object)   # (item uid, QImage | None)
+
+class ThumbnailWorker(QRunnable):
+    """Decodes one thumbnail in a pool thread; the QPixmap is made on the GUI thread."""
+    def __init__(self, path: str, uid: int):
+        super().__init__()
+        self._path = path
+        self._uid = uid
+        self.signals = _ThumbnailSignals()
+        self.setAutoDelete(True)
+
+    @Slot()
+    def run(self):
+        self.signals.finished.emit(self._uid, _read_thumbnail(self._path))
+
+_item_uids = itertools.count(1)
 
 class QueueItem:
+    """
+    A queued image. Its thumbnail lives in QPixmapCache under thumb_key; it is
+    produced when the row is first painted (or handed in ready-made by the
+    saver), and regenerated if Qt evicted it.
+    """
     def __init__(self, path: str):
         self.path = path
         self.filename = os.path.basename(path)
-        self.thumbnail = self._create_thumbnail(path)
-
-    def _create_thumbnail(self, path):
-        """Creates a thumbnail efficiently using QImageReader."""
-        try:
-            # QImageReader can read metadata and scale during decoding, which is faster
-            reader = QImageReader(path)
-            if reader.canRead():
-                original_size = reader.size()
-                if original_size.isValid():
-                    scaled_size = original_size.scaled(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE), Qt.AspectRatioMode.KeepAspectRatio)
-                    reader.setScaledSize(scaled_size)
-                
-                image = reader.read()
-                if not image.isNull():
-                    return QPixmap.fromImage(image)
-            
-            # Fallback
-            return QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE).fill(Qt.GlobalColor.lightGray)
-        except Exception as e:
-            print(f"Error creating thumbnail for {path}: {e}")
-            return QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE).fill(Qt.GlobalColor.red)
+        # Stable identity for async results (row numbers shift on drag-drop/removal)
+        self.uid = next(_item_uids)
+        self.thumb_key = f"queue-thumb|{os.path.abspath(path)}|{THUMBNAIL_SIZE}"
 
 class UploadQueueModel(QAbstractListModel):
     PathRole = Qt.ItemDataRole.UserRole + 1
@@ -37,6 +159,16 @@ class UploadQueueModel(QAbstractListModel):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.queue: list[QueueItem] = []
+        self._placeholder_icon: QIcon | None = None
+        # Items whose thumbnail is being decoded, by uid
+        self._decoding: dict[int, QueueItem] = {}
+        # Own pool so thumbnail decodes never queue behind saves or other background work
+        self._thumb_pool = QThreadPool(self)
+        self._thumb_pool.setObjectName("queue-thumbnails")
+        self._thumb_pool.setMaxThreadCount(min(os.cpu_count() or 1, 6))
+        # Thumbnails share the global QPixmapCache; make room for a full queue (KB)
+        if QPixmapCache.cacheLimit() < THUMBNAIL_CACHE_KB:
+            QPixmapCache.setCacheLimit(THUMBNAIL_CACHE_KB)
 
     def rowCount(self, parent=QModelIndex()):
         return len(self.queue)
@@ -50,25 +182,78 @@ class UploadQueueModel(QAbstractListModel):
         if role == Qt.ItemDataRole.DisplayRole:
             return item.filename
         if role == Qt.ItemDataRole.DecorationRole:
-            # Use QIcon for better display in ListView IconMode
-            return QIcon(item.thumbnail)
+            # Use QIcon for better display in ListView IconMode. Nothing is kept per
+            # item, so memory stays bounded by the cache; a miss schedules a decode.
+            pixmap = QPixmapCache.find(item.thumb_key)
+            if pixmap is None or pixmap.isNull():
+                self._request_thumbnail(item)
+                return self._get_placeholder_icon()
+            return QIcon(pixmap)
         if role == Qt.ItemDataRole.ToolTipRole:
             return item.path
         if role == self.PathRole:
             return item.path
 
-    def add_item(self, path: str):
-        # Insert at the beginning (newest first)
-        self.beginInsertRows(QModelIndex(), 0, 0)
-        self.queue.insert(0, QueueItem(path))
+    def _get_placeholder_icon(self) -> QIcon:
+        if self._placeholder_icon is None:
+            self._placeholder_icon = QIcon(_placeholder_pixmap())
+        return self._placeholder_icon
+
+    def _request_thumbnail(self, item: QueueItem):
+        """Decodes the thumbnail of a row that is being painted, off the GUI thread."""
+        if item.uid in self._decoding:
+            return
+        self._decoding[item.uid] = item
+        worker = ThumbnailWorker(item.path, item.uid)
+        worker.signals.finished.connect(self._on_thumbnail_ready)
+        self._thumb_pool.start(worker)
+
+    def _on_thumbnail_ready(self, uid: int, image):
+        item = self._decoding.pop(uid, None)
+        if item is None:
+            return
+        QPixmapCache.insert(item.thumb_key, QPixmap.fromImage(image) if image is not None else _placeholder_pixmap())
+        try:
+            row = self.queue.index(item)
+        except ValueError:
+            return  # removed while decoding
+        idx = self.index(row, 0)
+        self.dataChanged.emit(idx, idx, [Qt.ItemDataRole.DecorationRole])
+
+    def add_item(self, path: str, thumbnail: QImage | None = None):
+        self.add_items([path], [thumbnail])
+
+    def add_items(self, paths: list[str], thumbnails: list[QImage | None] | None = None):
+        """
+        Inserts several images (given oldest first) at the beginning, newest first,
+        with one insert. Nothing is decoded here: thumbnails produced by the saver
+        are used as-is, the rest are decoded when their row is first painted.
+        """
+        if not paths:
+            return
+        images = list(thumbnails) if thumbnails else [None] * len(paths)
+        items = [QueueItem(p) for p in reversed(paths)]
+        for item, img in zip(items, reversed(images)):
+            if img is not None:
+                # QPixmap must be created on the GUI thread
+                QPixmapCache.insert(item.thumb_key, QPixmap.fromImage(img))
+        self.beginInsertRows(QModelIndex(), 0, len(items) - 1)
+        self.queue[0:0] = items
         self.endInsertRows()
 
     def remove_items(self, indexes: list[QModelIndex]):
-        # Sort rows descending to avoid index shifting during removal
-        rows = sorted([index.row() for index in indexes], reverse=True)
-        for row in rows:
-            self.beginRemoveRows(QModelIndex(), row, row)
-            del self.queue[row]
+        # Sort rows descending to avoid index shifting during removal, and remove each
+        # run of consecutive rows with a single begin/endRemoveRows
+        rows = sorted({index.row() for index in indexes}, reverse=True)
+        i = 0
+        while i < len(rows):
+            end = start = rows[i]
+            i += 1
+            while i < len(rows) and rows[i] == start - 1:
+                start = rows[i]
+                i += 1
+            self.beginRemoveRows(QModelIndex(), start, end)
+            del self.queue[start:end + 1]
             self.endRemoveRows()
 
     def clear_queue(self):
@@ -80,10 +265,10 @@ class UploadQueueModel(QAbstractListModel):
         """Returns paths corresponding to the given indexes, sorted by their visual order."""
         if not indexes:
             return []
-             
-        # Sort indexes by row number to ensure the order matches the visual list
-        rows = sorted([index.row() for index in indexes])
-        return [self.queue[row].path for row in rows]
+
+        # One pass over the model in row order yields the visual order without sorting
+        rows = {index.row() for index in indexes}
+        return [item.path for row, item in enumerate(self.queue) if row in rows]
 
     # --- Drag and Drop Support (Internal Move) ---
     def flags(self, index):
@@ -107,10 +292,9 @@ class UploadQueueModel(QAbstractListModel):
 
         # Extract items to move
         items_to_move = self.queue[sourceRow:sourceRow + count]
-        
+
         # Remove from source
-        for i in range(count):
-            self.queue.pop(sourceRow)
+        del self.queue[sourceRow:sourceRow + count]
 
         # Adjust insertion index if moving downwards
         insertion_index = destinationChild
@@ -118,8 +302,7 @@ class UploadQueueModel(QAbstractListModel):
             insertion_index -= count
 
         # Insert at destination
-        for i in range(count):
-            self.queue.insert(insertion_index + i, items_to_move[i])
+        self.queue[insertion_index:insertion_index] = items_to_move
 
         self.endMoveRows()
         return True
\ No newline at end of file
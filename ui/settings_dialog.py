@@ -1,13 +1,50 @@
 # ui/settings_dialog.py
 import os
+from contextlib import contextmanager
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QTabWidget, QWidget, QFormLayout, QLineEdit,
     QPushButton, QSpinBox, QComboBox, QCheckBox, QFileDialog, QMessageBox,
     QKeySequenceEdit, QHBoxLayout, QLabel, QGroupBox
 )
+from PySide6.QtCore import QDir, QFileInfo, QObject, QRunnable, QThreadPool, Signal, Slot
 from PySide6.QtGui import QKeySequence
 from core.config import settings_manager
 
+_IMAGE_FORMATS = ("WebP", "PNG", "JPEG")
+_PROVIDERS = ("OpenAI", "Gemini")
+_STRATEGIES = ("Auto (自動)", "Fast (快速)", "Deep (深度)")
+_STRATEGY_KEYS = ("Auto", "Fast", "Deep")
+_STRATEGY_INDEX = {k: i for i, k in enumerate(_STRATEGY_KEYS)}
+_PORTABLE = QKeySequence.SequenceFormat.PortableText
+
+@contextmanager
+def _signals_blocked(page: QWidget):
+    """載入設定值時暫停分頁內各元件的變更信號（textChanged、valueChanged…）。"""
+    widgets = page.findChildren(QWidget)
+    was_blocked = [w.blockSignals(True) for w in widgets]
+    try:
+        yield
+    finally:
+        for w, was in zip(widgets, was_blocked):
+            w.blockSignals(was)
+
+class _ApiKeySignals(QObject):
+    loaded = Signal(str, str)   # (openai_key, gemini_key)
+
+class _ApiKeyLoader(QRunnable):
+    """在背景執行緒讀取 keyring（Windows DPAPI / macOS Keychain 可能阻塞數百毫秒）。"""
+    def __init__(self):
+        super().__init__()
+        self.signals = _ApiKeySignals()
+        self.setAutoDelete(True)
+
+    @Slot()
+    def run(self):
+        self.signals.loaded.emit(
+            settings_manager.get_api_key("OpenAI") or "",
+            settings_manager.get_api_key("Gemini") or "",
+        )
+
 class SettingsDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -21,8 +58,12 @@ class SettingsDialog(QDialog):
         self.tabs = QTabWidget()
 
         self.init_general_tab()
-        self.init_hotkeys_tab()
-        self.init_ai_tab()
+        # 熱鍵與 AI 分頁先放空白頁，第一次切換過去才建立元件並載入設定
+        self._lazy_tabs: dict[int, tuple] = {}
+        self._loaded_tabs: set[str] = set()
+        self._add_lazy_tab("hotkeys", "熱鍵", self.init_hotkeys_tab, self._load_hotkeys)
+        self._add_lazy_tab("ai", "AI 模型設定", self.init_ai_tab, self._load_ai)
+        self.tabs.currentChanged.connect(self._ensure_tab)
 
         self.layout.addWidget(self.tabs)
 
@@ -50,7 +91,7 @@ class SettingsDialog(QDialog):
         layout.addRow("截圖儲存資料夾:", path_layout)
 
         self.cb_image_format = QComboBox()
-        self.cb_image_format.addItems(["WebP", "PNG", "JPEG"])
+        self.cb_image_format.addItems(_IMAGE_FORMATS)
         layout.addRow("影像格式 (建議 WebP):", self.cb_image_format)
 
         self.sb_max_size = QSpinBox()
@@ -65,10 +106,23 @@ class SettingsDialog(QDialog):
         self.chk_auto_clear = QCheckBox("上傳成功後自動清空對應的待上傳項目")
         layout.addRow("自動清除:", self.chk_auto_clear)
 
-    def init_hotkeys_tab(self):
-        tab = QWidget()
+    def _add_lazy_tab(self, name: str, title: str, build, load):
+        page = QWidget()
+        index = self.tabs.addTab(page, title)
+        self._lazy_tabs[index] = (name, page, build, load)
+
+    def _ensure_tab(self, index: int):
+        entry = self._lazy_tabs.pop(index, None)
+        if entry is None:
+            return
+        name, page, build, load = entry
+        build(page)
+        with _signals_blocked(page):
+            load(self._snap)
+        self._loaded_tabs.add(name)
+
+    def init_hotkeys_tab(self, tab: QWidget):
         layout = QFormLayout(tab)
-        self.tabs.addTab(tab, "熱鍵")
 
         layout.addRow(QLabel("點擊輸入框後，按下您想要的組合鍵。"))
 
@@ -83,20 +137,18 @@ class SettingsDialog(QDialog):
 
         layout.addRow(QLabel("注意: 熱鍵變更將在儲存後立即套用。"))
 
-    def init_ai_tab(self):
-        tab = QWidget()
+    def init_ai_tab(self, tab: QWidget):
         main_layout = QVBoxLayout(tab)
-        self.tabs.addTab(tab, "AI 模型設定")
 
         general_group = QGroupBox("通用設定")
         general_layout = QFormLayout(general_group)
 
         self.cb_provider = QComboBox()
-        self.cb_provider.addItems(["OpenAI", "Gemini"])
+        self.cb_provider.addItems(_PROVIDERS)
         general_layout.addRow("主要 AI 供應商:", self.cb_provider)
 
         self.cb_strategy = QComboBox()
-        self.cb_strategy.addItems(["Auto (自動)", "Fast (快速)", "Deep (深度)"])
+        self.cb_strategy.addItems(_STRATEGIES)
         general_layout.addRow("速度策略:", self.cb_strategy)
 
         self.sb_timeout = QSpinBox()
@@ -138,7 +190,10 @@ class SettingsDialog(QDialog):
         main_layout.addStretch()
 
     def browse_save_path(self):
-        base = self.le_save_path.text().strip() or settings_manager.get_save_path()
+        # 開啟時已解析（並建立）的資料夾直接沿用；只有使用者改過的路徑才需檢查
+        base = self.le_save_path.text().strip() or self._loaded_save_path
+        if base != self._loaded_save_path and not QFileInfo(base).isDir():
+            base = QDir.homePath()
         path = QFileDialog.getExistingDirectory(self, "選擇儲存資料夾", base)
         if path:
             self.le_save_path.setText(path)
@@ -146,79 +201,117 @@ class SettingsDialog(QDialog):
     # ---- Load & Save ----
 
     def load_settings(self):
-        # 一般
-        self.le_save_path.setText(settings_manager.get_save_path())
-        self.cb_image_format.setCurrentText(str(settings_manager.get("Image/Format") or "PNG"))
-        self.sb_max_size.setValue(settings_manager.get_int("Image/MaxSize", 2048))
-        self.chk_retain_original.setChecked(settings_manager.get_bool("Image/RetainOriginal", True))
-        self.chk_auto_clear.setChecked(settings_manager.get_bool("General/AutoClearQueue", False))
-
-        # 熱鍵
-        self.kse_f2.setKeySequence(QKeySequence(str(settings_manager.get("Hotkeys/F2") or "F2")))
-        self.kse_f3.setKeySequence(QKeySequence(str(settings_manager.get("Hotkeys/F3") or "F3")))
-        self.kse_f4.setKeySequence(QKeySequence(str(settings_manager.get("Hotkeys/F4") or "F4")))
-
+        # 一次讀出全部設定；尚未建立的分頁在第一次顯示時沿用同一份
+        self._snap = settings_manager.snapshot()
+        with _signals_blocked(self.tabs.widget(0)):
+            self._load_general(self._snap)
+        self._ensure_tab(self.tabs.currentIndex())
+
+    def _load_general(self, snap):
+        self._loaded_save_path = settings_manager.get_save_path()
+        self.le_save_path.setText(self._loaded_save_path)
+        self.cb_image_format.setCurrentText(snap.get_str("Image/Format", "PNG"))
+        self.sb_max_size.setValue(snap.get_int("Image/MaxSize", 2048))
+        self.chk_retain_original.setChecked(snap.get_bool("Image/RetainOriginal", True))
+        self.chk_auto_clear.setChecked(snap.get_bool("General/AutoClearQueue", False))
+
+    def _load_hotkeys(self, snap):
+        self.kse_f2.setKeySequence(QKeySequence(snap.get_str("Hotkeys/F2", "F2")))
+        self.kse_f3.setKeySequence(QKeySequence(snap.get_str("Hotkeys/F3", "F3")))
+        self.kse_f4.setKeySequence(QKeySequence(snap.get_str("Hotkeys/F4", "F4")))
+
+    def _load_ai(self, snap):
         # AI - 通用
-        self.cb_provider.setCurrentText(str(settings_manager.get("AI/Provider") or "OpenAI"))
-        strategy = str(settings_manager.get("AI/Strategy") or "Auto")
-        self.cb_strategy.setCurrentIndex({"Auto": 0, "Fast": 1, "Deep": 2}.get(strategy, 0))
-        timeout = settings_manager.get_int("AI/Timeout", settings_manager.get_int("AI/TimeoutSec", 60))
+        self.cb_provider.setCurrentText(snap.get_str("AI/Provider", "OpenAI"))
+        strategy = snap.get_str("AI/Strategy", "Auto")
+        self.cb_strategy.setCurrentIndex(_STRATEGY_INDEX.get(strategy, 0))
+        timeout = snap.get_int("AI/Timeout", snap.get_int("AI/TimeoutSec", 60))
         self.sb_timeout.setValue(timeout)
-        self.sb_max_images.setValue(settings_manager.get_int("AI/MaxImages", 5))
+        self.sb_max_images.setValue(snap.get_int("AI/MaxImages", 5))
 
         # AI - OpenAI
-        self.current_openai_key = settings_manager.get_api_key("OpenAI") or ""
-        if self.current_openai_key:
-            self.le_openai_api_key.setText(self.current_openai_key)
-            self.le_openai_api_key.setPlaceholderText("已設定")
-        self.le_openai_model_fast.setText(str(settings_manager.get("OpenAI/ModelFast") or "gpt-4o-mini"))
-        self.le_openai_model_deep.setText(str(settings_manager.get("OpenAI/ModelDeep") or "gpt-4o"))
+        self.le_openai_model_fast.setText(snap.get_str("OpenAI/ModelFast", "gpt-4o-mini"))
+        self.le_openai_model_deep.setText(snap.get_str("OpenAI/ModelDeep", "gpt-4o"))
 
         # AI - Gemini
-        self.current_gemini_key = settings_manager.get_api_key("Gemini") or ""
-        if self.current_gemini_key:
-            self.le_gemini_api_key.setText(self.current_gemini_key)
-            self.le_gemini_api_key.setPlaceholderText("已設定")
-        self.le_gemini_model_fast.setText(str(settings_manager.get("Gemini/ModelFast") or "gemini-1.5-flash"))
-        self.le_gemini_model_deep.setText(str(settings_manager.get("Gemini/ModelDeep") or "gemini-1.5-pro"))
+        self.le_gemini_model_fast.setText(snap.get_str("Gemini/ModelFast", "gemini-1.5-flash"))
+        self.le_gemini_model_deep.setText(snap.get_str("Gemini/ModelDeep", "gemini-1.5-pro"))
+
+        # API Key 改在背景讀取；讀完前不可儲存，以免把尚未載入的空白當成清除金鑰
+        for le in (self.le_openai_api_key, self.le_gemini_api_key):
+            le.setEnabled(False)
+            le.setPlaceholderText("讀取中...")
+        self.btn_save.setEnabled(False)
+        loader = _ApiKeyLoader()
+        loader.signals.loaded.connect(self._on_api_keys_loaded)
+        QThreadPool.globalInstance().start(loader)
+
+    def _on_api_keys_loaded(self, openai_key: str, gemini_key: str):
+        self.current_openai_key = openai_key
+        self.current_gemini_key = gemini_key
+        for le, key in ((self.le_openai_api_key, openai_key), (self.le_gemini_api_key, gemini_key)):
+            le.setEnabled(True)
+            le.setPlaceholderText("已設定" if key else "")
+            if key:
+                le.setText(key)
+        self.btn_save.setEnabled(True)
 
     def save_settings(self):
         try:
-            # 一般
-            settings_manager.set_save_path(self.le_save_path.text())
-            settings_manager.set("Image/Format", self.cb_image_format.currentText())
-            settings_manager.set("Image/MaxSize", self.sb_max_size.value())
-            settings_manager.set("Image/RetainOriginal", self.chk_retain_original.isChecked())
-            settings_manager.set("General/AutoClearQueue", self.chk_auto_clear.isChecked())
-
-            # 熱鍵
-            settings_manager.set("Hotkeys/F2", self.kse_f2.keySequence().toString(QKeySequence.SequenceFormat.PortableText))
-            settings_manager.set("Hotkeys/F3", self.kse_f3.keySequence().toString(QKeySequence.SequenceFormat.PortableText))
-            settings_manager.set("Hotkeys/F4", self.kse_f4.keySequence().toString(QKeySequence.SequenceFormat.PortableText))
-
-            # AI - 通用
-            settings_manager.set("AI/Provider", self.cb_provider.currentText())
-            strategy = ["Auto", "Fast", "Deep"][self.cb_strategy.currentIndex()]
-            settings_manager.set("AI/Strategy", strategy)
-            settings_manager.set("AI/Timeout", self.sb_timeout.value())
-            settings_manager.set("AI/TimeoutSec", self.sb_timeout.value())  # 舊程式相容
-            settings_manager.set("AI/MaxImages", self.sb_max_images.value())
-
-            # AI - OpenAI
-            new_openai_key = self.le_openai_api_key.text().strip()
-            if new_openai_key != (self.current_openai_key or ""):
-                settings_manager.set_api_key("OpenAI", new_openai_key or None)
-            settings_manager.set("OpenAI/ModelFast", self.le_openai_model_fast.text().strip())
-            settings_manager.set("OpenAI/ModelDeep", self.le_openai_model_deep.text().strip())
-
-            # AI - Gemini
-            new_gemini_key = self.le_gemini_api_key.text().strip()
-            if new_gemini_key != (self.current_gemini_key or ""):
-                settings_manager.set_api_key("Gemini", new_gemini_key or None)
-            settings_manager.set("Gemini/ModelFast", self.le_gemini_model_fast.text().strip())
-            settings_manager.set("Gemini/ModelDeep", self.le_gemini_model_deep.text().strip())
-
-            settings_manager.save_and_emit()
+            snap = self._snap
+            changed: set[str] = set()
+
+            def put(key, value):
+                # 只寫入與開啟視窗時不同的值
+                if snap.differs(key, value):
+                    settings_manager.set(key, value)
+                    changed.add(key)
+
+            # 所有寫入先暫存，結束時一次寫回設定檔
+            with settings_manager.batch():
+                # 一般
+                if self.le_save_path.text() != self._loaded_save_path:
+                    settings_manager.set_save_path(self.le_save_path.text())
+                    changed.add("Paths/SaveDir")
+                put("Image/Format", self.cb_image_format.currentText())
+                put("Image/MaxSize", self.sb_max_size.value())
+                put("Image/RetainOriginal", self.chk_retain_original.isChecked())
+                put("General/AutoClearQueue", self.chk_auto_clear.isChecked())
+
+                # 未開啟過的分頁沒有變更，不寫回
+                if "hotkeys" in self._loaded_tabs:
+                    # 熱鍵
+                    put("Hotkeys/F2", self.kse_f2.keySequence().toString(_PORTABLE))
+                    put("Hotkeys/F3", self.kse_f3.keySequence().toString(_PORTABLE))
+                    put("Hotkeys/F4", self.kse_f4.keySequence().toString(_PORTABLE))
+
+                if "ai" in self._loaded_tabs:
+                    # AI - 通用
+                    put("AI/Provider", self.cb_provider.currentText())
+                    put("AI/Strategy", _STRATEGY_KEYS[self.cb_strategy.currentIndex()])
+                    put("AI/Timeout", self.sb_timeout.value())
+                    put("AI/TimeoutSec", self.sb_timeout.value())  # 舊程式相容
+                    put("AI/MaxImages", self.sb_max_images.value())
+
+                    # AI - OpenAI
+                    new_openai_key = self.le_openai_api_key.text().strip()
+                    if new_openai_key != (self.current_openai_key or ""):
+                        settings_manager.set_api_key("OpenAI", new_openai_key or None)
+                        changed.add("OpenAI/APIKey")
+                    put("OpenAI/ModelFast", self.le_openai_model_fast.text().strip())
+                    put("OpenAI/ModelDeep", self.le_openai_model_deep.text().strip())
+
+                    # AI - Gemini
+                    new_gemini_key = self.le_gemini_api_key.text().strip()
+                    if new_gemini_key != (self.current_gemini_key or ""):
+                        settings_manager.set_api_key("Gemini", new_gemini_key or None)
+                        changed.add("Gemini/APIKey")
+                    put("Gemini/ModelFast", self.le_gemini_model_fast.text().strip())
+                    put("Gemini/ModelDeep", self.le_gemini_model_deep.text().strip())
+
+            # 沒有任何變更就不通知，熱鍵／AI client 等不必重新設定
+            if changed:
+                settings_manager.save_and_emit(changed_keys=changed)
             QMessageBox.information(self, "成功", "設定已儲存並套用。")
             self.accept()
         except RuntimeError as e:
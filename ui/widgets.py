@@ -1,7 +1,9 @@
 # ui/widgets.py
-from PySide6.QtWidgets import QWidget, QFrame, QLabel, QGridLayout
+import html
+
+from PySide6.QtWidgets import QWidget, QFrame, QLabel, QToolButton, QVBoxLayout, QHBoxLayout
 from PySide6.QtGui import QPainter, QPen, QColor, QGuiApplication
-from PySide6.QtCore import Qt, QRect, Signal
+from PySide6.QtCore import Qt, QPoint, QRect, QTimer, Signal
 
 from core.models import (
     AnalysisResult, SidePlan,
@@ -9,6 +11,8 @@ from core.models import (
 
 # ----------- 擷取工具 -----------
 
+_MASK_COLOR = QColor(0, 0, 0, 80)
+
 class SnippingTool(QWidget):
     snipping_finished = Signal(dict)
 
@@ -21,44 +25,84 @@ class SnippingTool(QWidget):
         )
         self.setWindowState(Qt.WindowState.WindowFullScreen)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        # paintEvent 會以 Source 模式填滿整個重繪區，不需要 Qt 先清背景
+        self.setAttribute(Qt.WidgetAttribute.WA_NoSystemBackground)
+        self.setCursor(Qt.CursorShape.CrossCursor)
+        self.begin = None
+        self.end = None
+        self.is_snipping = False
+        self._border_pen = QPen(QColor(0, 120, 215), 2)
+        self._virtual_origin = QPoint()
+        # 上次畫出的選取框；拖曳時只重繪新舊選取框聯集的範圍
+        self._last_rect = QRect()
+        # 高回報率滑鼠每秒可送出上千次移動事件；重繪最多每畫面（約 16ms）一次
+        self._paint_timer = QTimer(self)
+        self._paint_timer.setSingleShot(True)
+        self._paint_timer.setInterval(16)
+        self._paint_timer.timeout.connect(self._update_selection)
+
+    def start(self):
+        """覆蓋整個虛擬桌面（所有螢幕）並開始新的框選；座標換算以虛擬桌面原點為準。"""
         self.begin = None
         self.end = None
         self.is_snipping = False
+        self._last_rect = QRect()
+        self.setWindowState(Qt.WindowState.WindowNoState)
+        geo = QGuiApplication.primaryScreen().virtualGeometry()
+        # 記下本次框選的虛擬桌面原點，放開滑鼠時直接換算，不再查詢螢幕配置
+        self._virtual_origin = geo.topLeft()
+        self.setGeometry(geo)
+        self.show()
+        self.raise_()
+        self.activateWindow()
 
     def paintEvent(self, event):
         if not self.isVisible():
             return
+        # 只重繪需要更新的區域（拖曳時是新舊選取框的聯集，而非整個虛擬桌面）
+        dirty = event.rect().intersected(self.rect())
+        if dirty.isEmpty():
+            return
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         rect = QRect(self.begin or self.rect().center(), self.end or self.rect().center()).normalized()
-        painter.fillRect(self.rect(), QColor(0, 0, 0, 80))
-        if rect.width() > 0 and rect.height() > 0:
-            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Clear)
-            painter.fillRect(rect, Qt.GlobalColor.transparent)
+        # 半透明遮罩直接覆寫像素（Source），不與底下的透明背景做 alpha 混合；
+        # 選取框同樣以 Source 寫入透明色挖空
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        painter.fillRect(dirty, _MASK_COLOR)
+        if rect.width() > 0 and rect.height() > 0 and rect.adjusted(-2, -2, 2, 2).intersects(dirty):
+            painter.fillRect(rect.intersected(dirty), Qt.GlobalColor.transparent)
             painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
-            painter.setPen(QPen(QColor(0, 120, 215), 2))
+            painter.setPen(self._border_pen)
             painter.drawRect(rect)
 
+    def _update_selection(self):
+        # 2px 框線（含反鋸齒）會超出選取框邊緣，重繪範圍多留一點
+        rect = QRect(self.begin, self.end).normalized()
+        self.update(self._last_rect.united(rect).adjusted(-3, -3, 3, 3))
+        self._last_rect = rect
+
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
             self.begin = event.pos()
             self.end = self.begin
             self.is_snipping = True
-            self.update()
+            self._update_selection()
         elif event.button() == Qt.MouseButton.RightButton:
             self.close()
 
     def mouseMoveEvent(self, event):
         if self.is_snipping:
             self.end = event.pos()
-            self.update()
+            if not self._paint_timer.isActive():
+                self._paint_timer.start()
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton and self.is_snipping:
             self.is_snipping = False
             rect = QRect(self.begin, self.end).normalized()
             if rect.width() > 10 and rect.height() > 10:
-                virtual_origin = QGuiApplication.primaryScreen().virtualGeometry().topLeft()
+                virtual_origin = self._virtual_origin
                 monitor_dict = {
                     'left': virtual_origin.x() + rect.left(),
                     'top': virtual_origin.y() + rect.top(),
@@ -75,233 +119,288 @@ class SnippingTool(QWidget):
 
 # ----------- 結果卡片 -----------
 
+# 卡片用的格式化小工具（模組層級，不必每張卡片重新建立）
+def _fmt_num(x):
+    try:
+        return f"{float(x):.2f}"
+    except Exception:
+        return "N/A"
+
+def _fmt_pct(x):
+    try:
+        return f"{float(x)*100:.1f}%"
+    except Exception:
+        return "—"
+
+def _html(value, empty: str = "—") -> str:
+    """純文字轉成可放進 rich text 的片段（跳脫 HTML、換行轉 <br>）；空值顯示 empty。"""
+    if value is None or value == "":
+        return empty
+    return html.escape(str(value)).replace("\n", "<br>")
+
+def _get(obj, key, default=None):
+    if isinstance(obj, dict):
+        return obj.get(key, default)
+    return getattr(obj, key, default)
+
 class AnalysisCard(QFrame):
     def __init__(self, result: AnalysisResult, parent=None):
         super().__init__(parent)
         self.setObjectName("ResultCard")
         self.setFrameShape(QFrame.Shape.StyledPanel)
-        self.setup_ui(result)
-
-    def setup_ui(self, result: AnalysisResult):
-        layout = QGridLayout(self)
-
-        # --- 小工具 ---
-        def fmt_num(x):
-            try:
-                return f"{float(x):.2f}"
-            except Exception:
-                return "N/A"
-
-        def fmt_pct(x):
-            try:
-                return f"{float(x)*100:.1f}%"
-            except Exception:
-                return "—"
-
-        def get(obj, key, default=None):
-            if isinstance(obj, dict):
-                return obj.get(key, default)
-            return getattr(obj, key, default)
-
-        conf_pct = int(round(((result.confidence or 0.0) * 100)))
+        self.setup_ui()
+        self.update_result(result)
+
+    def setup_ui(self):
+        # 只為需要 QSS 樣式的欄位（標題、方向、備註、模型資訊）建立獨立 QLabel；
+        # 其餘內容組成一段 rich text 放進同一個 QLabel，每張卡片只有少數元件需要排版
+        layout = QVBoxLayout(self)
+
+        self._title = QLabel()
+        self._title.setObjectName("CardTitle")
+        self._title.setTextFormat(Qt.TextFormat.PlainText)
+        layout.addWidget(self._title)
+
+        # 方向 / 留倉
+        self._bias_value = QLabel()
+        self._bias_value.setObjectName("CardBias")
+        self._hold_value = QLabel()
+        header = QHBoxLayout()
+        header.addWidget(QLabel("建議方向:"))
+        header.addWidget(self._bias_value)
+        header.addWidget(QLabel("留倉短波:"))
+        header.addWidget(self._hold_value)
+        header.addStretch(1)
+        layout.addLayout(header)
+
+        self._details = QLabel()
+        self._details.setTextFormat(Qt.TextFormat.RichText)
+        self._details.setWordWrap(True)
+        layout.addWidget(self._details)
+
+        # 選填區塊（BBand、籌碼、位階、多空方案等）預設收合，第一次展開時才產生內容
+        self._result = None
+        self._sections_built = False
+        self._sections_toggle = QToolButton()
+        self._sections_toggle.setText("詳細分析")
+        self._sections_toggle.setCheckable(True)
+        self._sections_toggle.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextBesideIcon)
+        self._sections_toggle.setArrowType(Qt.ArrowType.RightArrow)
+        self._sections_toggle.toggled.connect(self._toggle_sections)
+        self._sections = QLabel()
+        self._sections.setTextFormat(Qt.TextFormat.RichText)
+        self._sections.setWordWrap(True)
+        self._sections.setVisible(False)
+        layout.addWidget(self._sections_toggle, 0, Qt.AlignmentFlag.AlignLeft)
+        layout.addWidget(self._sections)
+
+        self._notes_title = QLabel("備註：")
+        self._notes = QLabel()
+        self._notes.setWordWrap(True)
+        self._notes.setObjectName("CardNotes")
+        layout.addWidget(self._notes_title)
+        layout.addWidget(self._notes)
+
+        self._meta = QLabel()
+        self._meta.setObjectName("CardMeta")
+        layout.addWidget(self._meta, 0, Qt.AlignmentFlag.AlignRight)
+
+    def update_result(self, result: AnalysisResult):
+        """以新結果更新既有元件的文字；卡片可重複使用，不必重建整個元件樹。"""
+        # 信心值介於 0~1，四捨五入到整數百分比
+        conf_pct = int((result.confidence or 0.0) * 100 + 0.5)
         risk_txt = f"{getattr(result, 'risk_score', 0)}/5"
 
         # 標的（代號 / 名稱） + 標題
         subject = ""
         if getattr(result, "symbol", None) or getattr(result, "name", None):
             subject = f"標的：{result.symbol or '-'} / {result.name or '-'}  |  "
-        title = QLabel(f"{subject}交易建議 (信心: {conf_pct}%, 風險: {risk_txt})")
-        title.setObjectName("CardTitle")
-        layout.addWidget(title, 0, 0, 1, 4)
-
-        # 方向 / 入場 / 停損 / 留倉
-        bias_label = QLabel("建議方向:")
-        bias_value = QLabel(result.bias)
-        bias_value.setObjectName("CardBias")
-        layout.addWidget(bias_label, 1, 0)
-        layout.addWidget(bias_value, 1, 1)
-
-        entry_label = QLabel("建議入場:")
-        entry_value = QLabel(fmt_num(result.entry_price) if result.entry_price is not None else "N/A")
-        layout.addWidget(entry_label, 2, 0)
-        layout.addWidget(entry_value, 2, 1)
-
-        sl_label = QLabel("建議停損:")
-        sl_value = QLabel(fmt_num(result.stop_loss) if result.stop_loss is not None else "N/A")
-        layout.addWidget(sl_label, 3, 0)
-        layout.addWidget(sl_value, 3, 1)
-
-        hold_label = QLabel("留倉短波:")
-        hold_text = "是" if result.hold_overnight else ("否" if result.hold_overnight is False else "依條件")
-        hold_value = QLabel(hold_text)
-        layout.addWidget(hold_label, 1, 2)
-        layout.addWidget(hold_value, 1, 3)
-
-        row = 4
-
-        def add_block(title_text: str, value_text: str):
-            nonlocal row
-            lbl = QLabel(title_text)
-            val = QLabel(value_text or "—")
-            val.setWordWrap(True)
-            layout.addWidget(lbl, row, 0)
-            layout.addWidget(val, row, 1, 1, 3)
-            row += 1
-
-        add_block("結構：", result.structure)
-        add_block("動能：", result.momentum)
-        add_block("關鍵價位：", result.key_levels)
+        self._title.setText(f"{subject}交易建議 (信心: {conf_pct}%, 風險: {risk_txt})")
+
+        self._bias_value.setText(result.bias)
+        # QSS 依 bias 屬性著色（QLabel#CardBias[bias="多"] 等）；屬性變更後需重新 polish 才會套用
+        if self._bias_value.property("bias") != result.bias:
+            self._bias_value.setProperty("bias", result.bias)
+            style = self._bias_value.style()
+            style.unpolish(self._bias_value)
+            style.polish(self._bias_value)
+        self._hold_value.setText(
+            "是" if result.hold_overnight else ("否" if result.hold_overnight is False else "依條件")
+        )
 
-        # --- BBand 專區 ---
+        self._details.setText(self._details_html(result))
+
+        # 重用卡片時恢復收合狀態；舊結果的選填區塊內容作廢，等下次展開再產生
+        self._result = result
+        self._sections_built = False
+        self._sections.clear()
+        self._sections_toggle.blockSignals(True)
+        self._sections_toggle.setChecked(False)
+        self._sections_toggle.blockSignals(False)
+        self._sections_toggle.setArrowType(Qt.ArrowType.RightArrow)
+        self._sections.setVisible(False)
+        self._sections_toggle.setVisible(self._has_sections(result))
+
+        has_notes = bool(result.notes)
+        self._notes.setText(result.notes or "")
+        self._notes_title.setVisible(has_notes)
+        self._notes.setVisible(has_notes)
+
+        rt = result.response_time
+        has_meta = bool(result.model_used and rt is not None)
+        self._meta.setText(f"Model: {result.model_used} | Time: {rt:.2f}s" if has_meta else "")
+        self._meta.setVisible(has_meta)
+
+    def _toggle_sections(self, checked: bool):
+        if checked and not self._sections_built and self._result is not None:
+            self._sections.setText(self._sections_html(self._result))
+            self._sections_built = True
+        self._sections_toggle.setArrowType(Qt.ArrowType.DownArrow if checked else Qt.ArrowType.RightArrow)
+        self._sections.setVisible(checked)
+
+    @staticmethod
+    def _table_html(rows: list[tuple[str, str]]) -> str:
+        table = "".join(
+            f'<tr><td style="white-space: nowrap; padding-right: 8px;">{_html(t)}</td><td>{v}</td></tr>'
+            for t, v in rows
+        )
+        return f'<table cellspacing="0" cellpadding="2">{table}</table>'
+
+    @classmethod
+    def _details_html(cls, result: AnalysisResult) -> str:
+        rows: list[tuple[str, str]] = [
+            ("建議入場:", _fmt_num(result.entry_price) if result.entry_price is not None else "N/A"),
+            ("建議停損:", _fmt_num(result.stop_loss) if result.stop_loss is not None else "N/A"),
+            ("結構：", _html(result.structure)),
+            ("動能：", _html(result.momentum)),
+            ("關鍵價位：", _html(result.key_levels)),
+            ("交易計畫（總結）：", _html(result.trade_plan)),
+            ("加分訊號：", _html(result.bonus_signals)),
+        ]
+        return (
+            cls._table_html(rows)
+            + f"<p><b>分析理由：</b><br>{_html(result.rationale, '')}</p>"
+        )
+
+    @staticmethod
+    def _has_sections(result: AnalysisResult) -> bool:
+        return bool(
+            getattr(result, "bband", None) or getattr(result, "chips", None)
+            or result.plan_breakdown or getattr(result, "position", None)
+            or result.operation_cycle or result.long or result.short
+        )
+
+    @classmethod
+    def _sections_html(cls, result: AnalysisResult) -> str:
+        # 選填區塊一次取出；多數結果只有少數區塊有值，其餘直接略過
         bb = getattr(result, "bband", None)
+        chips = getattr(result, "chips", None) or ()
+        plan_bd = result.plan_breakdown
+        pos = getattr(result, "position", None)
+        oc = result.operation_cycle
+
+        rows: list[tuple[str, str]] = []
+
+        # --- BBand 專區 ---
         if bb:
-            lbl = QLabel("BBand（布林）：")
-            layout.addWidget(lbl, row, 0)
-            
             lines = []
             tags = []
-            
-            if get(bb, "squeeze", None):
+
+            if _get(bb, "squeeze", None):
                 tags.append("擠壓")
-            pb = get(bb, "percent_b", None) or get(bb, "%b", None)
-            if pb is not None and (float(pb) >= 0.9 or float(pb) <= 0.1):
+            pct_b = _get(bb, "percent_b", None) or _get(bb, "%b", None)
+            if pct_b is not None and (float(pct_b) >= 0.9 or float(pct_b) <= 0.1):
                 tags.append("貼邊")
 
-            if get(bb, "period", None) or get(bb, "dev", None):
-                lines.append(f"參數：{get(bb,'period','?')}/{get(bb,'dev','?')} " + (f"[{' '.join(tags)}]" if tags else ""))
-            ma = get(bb, "ma", None)
-            up = get(bb, "upper", None)
-            lo = get(bb, "lower", None)
+            if _get(bb, "period", None) or _get(bb, "dev", None):
+                lines.append(f"參數：{_get(bb,'period','?')}/{_get(bb,'dev','?')} " + (f"[{' '.join(tags)}]" if tags else ""))
+            ma = _get(bb, "ma", None)
+            up = _get(bb, "upper", None)
+            lo = _get(bb, "lower", None)
             if ma or up or lo:
                 parts = []
-                if ma is not None: parts.append(f"中軌≈{fmt_num(ma)}")
-                if up is not None: parts.append(f"上軌≈{fmt_num(up)}")
-                if lo is not None: parts.append(f"下軌≈{fmt_num(lo)}")
+                if ma is not None: parts.append(f"中軌≈{_fmt_num(ma)}")
+                if up is not None: parts.append(f"上軌≈{_fmt_num(up)}")
+                if lo is not None: parts.append(f"下軌≈{_fmt_num(lo)}")
                 if parts: lines.append("、".join(parts))
-            width = get(bb, "width", None)
+            width = _get(bb, "width", None)
             if width is not None:
-                lines.append(f"帶寬：{fmt_pct(width)}")
-            if pb is not None:
+                lines.append(f"帶寬：{_fmt_pct(width)}")
+            if pct_b is not None:
                 try:
-                    pbv = float(pb)
+                    pbv = float(pct_b)
                     lines.append(f"%B：{pbv:.2f}（0=下軌, 0.5=中軌, 1=上軌）")
                 except Exception:
                     pass
-            sq = get(bb, "squeeze", None)
+            sq = _get(bb, "squeeze", None)
             if sq is not None and not tags: # 如果已在參數行顯示 tag，這裡可省略
                 sqtxt = "狹縮" if sq else "非狹縮"
-                r = get(bb, "squeeze_rank_1y", None)
+                r = _get(bb, "squeeze_rank_1y", None)
                 if r is not None:
-                    sqtxt += f"（近1年分位≈{fmt_pct(r)}）"
+                    sqtxt += f"（近1年分位≈{_fmt_pct(r)}）"
                 lines.append(sqtxt)
 
-            note = (get(bb, "note", "") or "").strip()
+            note = (_get(bb, "note", "") or "").strip()
             if note:
                 lines.append(note)
-            val = QLabel("；".join(lines) if lines else "—")
-            val.setWordWrap(True)
-            layout.addWidget(val, row, 1, 1, 3); row += 1
+            rows.append(("BBand（布林）：", _html("；".join(lines))))
 
-        add_block("交易計畫（總結）：", result.trade_plan)
-        add_block("加分訊號：", result.bonus_signals)
-        
         # --- 籌碼分析 ---
-        chips = getattr(result, "chips", [])
         if chips:
             score_txt = f" (綜合評分: {result.chip_score}/5)" if getattr(result, 'chip_score', None) is not None else ""
-            lbl = QLabel(f"籌碼分析：{score_txt}")
-            
-            lines = []
-            for chip in chips:
-                line = (f"<b>{getattr(chip, 'period', '?')}</b>: "
-                        f"{getattr(chip, 'pattern', 'N/A')} "
-                        f"(評分: {getattr(chip, 'score', '?')}/5). "
-                        f"<i>{getattr(chip, 'comment', '')}</i>")
-                lines.append(line)
-            
-            val = QLabel("<br>".join(lines))
-            val.setWordWrap(True)
-            
-            layout.addWidget(lbl, row, 0)
-            layout.addWidget(val, row, 1, 1, 3)
-            row += 1
+            rows.append((f"籌碼分析：{score_txt}", "<br>".join(
+                f"<b>{_html(getattr(chip, 'period', '?'))}</b>: {_html(getattr(chip, 'pattern', 'N/A'))} "
+                f"(評分: {_html(getattr(chip, 'score', '?'))}/5). <i>{_html(getattr(chip, 'comment', ''), '')}</i>"
+                for chip in chips
+            )))
 
         # 交易計畫（條列）
-        if result.plan_breakdown:
-            lbl = QLabel("交易計畫（條列）：")
-            layout.addWidget(lbl, row, 0)
-            pb = result.plan_breakdown
+        if plan_bd:
             lines = []
-            if pb.entry: lines.append(f"1) 進場：{pb.entry}")
-            if pb.stop: lines.append(f"2) 停損：{pb.stop}")
-            if pb.take_profit: lines.append(f"3) 停利：{pb.take_profit}")
-            val = QLabel("\n".join(lines) if lines else "—"); val.setWordWrap(True)
-            layout.addWidget(val, row, 1, 1, 3); row += 1
+            if plan_bd.entry: lines.append(f"1) 進場：{plan_bd.entry}")
+            if plan_bd.stop: lines.append(f"2) 停損：{plan_bd.stop}")
+            if plan_bd.take_profit: lines.append(f"3) 停利：{plan_bd.take_profit}")
+            rows.append(("交易計畫（條列）：", _html("\n".join(lines))))
 
         # 位階判斷 / 操作週期
-        pos = getattr(result, "position", None)
         if pos:
-            lbl = QLabel("位階判斷：")
-            layout.addWidget(lbl, row, 0)
             parts = [f"{getattr(pos, 'level', '—')}"]
             try:
-                parts.append(f"距52W高 {fmt_pct(getattr(pos, 'pct_from_52w_high', None))}")
-                parts.append(f"距52W低 {fmt_pct(getattr(pos, 'pct_from_52w_low', None))}")
-                parts.append(f"距MA200 {fmt_pct(getattr(pos, 'pct_from_ma200', None))}")
-                parts.append(f"距MA60 {fmt_pct(getattr(pos, 'pct_from_ma60', None))}")
-                parts.append(f"AVWAP距離 {fmt_pct(getattr(pos, 'avwap_from_pivot', None))}")
+                parts.append(f"距52W高 {_fmt_pct(getattr(pos, 'pct_from_52w_high', None))}")
+                parts.append(f"距52W低 {_fmt_pct(getattr(pos, 'pct_from_52w_low', None))}")
+                parts.append(f"距MA200 {_fmt_pct(getattr(pos, 'pct_from_ma200', None))}")
+                parts.append(f"距MA60 {_fmt_pct(getattr(pos, 'pct_from_ma60', None))}")
+                parts.append(f"AVWAP距離 {_fmt_pct(getattr(pos, 'avwap_from_pivot', None))}")
             except Exception:
                 pass
-            val = QLabel("；".join(parts))
-            val.setWordWrap(True)
-            layout.addWidget(val, row, 1, 1, 3); row += 1
-
-        if result.operation_cycle:
-            oc = result.operation_cycle
-            lbl = QLabel("操作週期：")
-            layout.addWidget(lbl, row, 0)
+            rows.append(("位階判斷：", _html("；".join(parts))))
+
+        if oc:
             lines = []
             if oc.momentum: lines.append(f"1) 動能：{oc.momentum}")
             if oc.volume: lines.append(f"2) 成交量：{oc.volume}")
             if oc.institutions: lines.append(f"3) 法人籌碼：{oc.institutions}")
             if oc.concentration: lines.append(f"4) 籌碼集中度：{oc.concentration}")
-            val = QLabel("\n".join(lines) if lines else "—"); val.setWordWrap(True)
-            layout.addWidget(val, row, 1, 1, 3); row += 1
+            rows.append(("操作週期：", _html("\n".join(lines))))
 
         # 多／空方案
-        def add_side_block(side_name: str, plan: SidePlan | None):
-            nonlocal row
-            if not plan:
-                return
-            lbl = QLabel(f"{side_name}方案："); layout.addWidget(lbl, row, 0)
-            v = []
-            v.append(f"入場：{fmt_num(plan.entry_price)}" if plan.entry_price is not None else "入場：N/A")
-            v.append(f"停損：{fmt_num(plan.stop_loss)}" if plan.stop_loss is not None else "停損：N/A")
-            if plan.targets:
-                try:
-                    tg = ", ".join([fmt_num(t) for t in plan.targets])
-                except Exception:
-                    tg = ""
-                if tg:
-                    v.append(f"停利目標：{tg}")
-            detail = "；".join(v)
-            detail = detail + (f"\n{plan.plan}" if getattr(plan, "plan", "") else "")
-            val = QLabel(detail); val.setWordWrap(True)
-            layout.addWidget(val, row, 1, 1, 3); row += 1
-
-        add_side_block("多方", result.long)
-        add_side_block("空方", result.short)
-
-        lbl_r = QLabel("分析理由："); layout.addWidget(lbl_r, row, 0, 1, 4); row += 1
-        txt_r = QLabel(result.rationale); txt_r.setWordWrap(True)
-        layout.addWidget(txt_r, row, 0, 1, 4); row += 1
-
-        if result.notes:
-            lbl_n = QLabel("備註："); layout.addWidget(lbl_n, row, 0, 1, 4); row += 1
-            txt_n = QLabel(result.notes); txt_n.setWordWrap(True); txt_n.setObjectName("CardNotes")
-            layout.addWidget(txt_n, row, 0, 1, 4); row += 1
-
-        if result.model_used and result.response_time is not None:
-            meta = QLabel(f"Model: {result.model_used} | Time: {result.response_time:.2f}s")
-            meta.setObjectName("CardMeta")
-            layout.addWidget(meta, row, 0, 1, 4, Qt.AlignmentFlag.AlignRight)
+        for side_name, plan in (("多方", result.long), ("空方", result.short)):
+            if plan:
+                rows.append((f"{side_name}方案：", _html(cls._side_plan_text(plan))))
+
+        return cls._table_html(rows)
+
+    @staticmethod
+    def _side_plan_text(plan: SidePlan) -> str:
+        v = []
+        v.append(f"入場：{_fmt_num(plan.entry_price)}" if plan.entry_price is not None else "入場：N/A")
+        v.append(f"停損：{_fmt_num(plan.stop_loss)}" if plan.stop_loss is not None else "停損：N/A")
+        if plan.targets:
+            try:
+                tg = ", ".join([_fmt_num(t) for t in plan.targets])
+            except Exception:
+                tg = ""
+            if tg:
+                v.append(f"停利目標：{tg}")
+        detail = "；".join(v)
+        return detail + (f"\n{plan.plan}" if getattr(plan, "plan", "") else "")